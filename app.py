@@ -2,13 +2,50 @@ import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 import streamlit as st
-from database import init_db, add_user, login_user, store_quiz_result, get_user_scores, get_user_stats
-from quiz_generator import generate_quiz_questions, evaluate_quiz
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from database import init_db, add_user, login_user, get_user_score_columns, get_user_stats
+from login_guard import LoginThrottled
+from result_writer import submit_quiz_result
+from quiz_generator import generate_quiz_questions, evaluate_quiz, stream_model_questions, MODEL_STREAMING
+from nlp_resources import warm_up
 import math
 
 # Initialize the database
 init_db()
 
+# Load NLP resources once per process so the first quiz isn't a cold start.
+# If they can't be loaded now, quiz generation retries and reports the error
+try:
+    warm_up()
+except Exception as e:
+    print(f"Error loading NLP resources: {e}")
+
+def render_question(i, question):
+    """Show a question's text and its four options"""
+    st.write(f"\n**Question {i}:** {question['question']}")
+    
+    # Create columns for options
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**A.** " + question['options']['A'][:150] + "..." if len(question['options']['A']) > 150 else question['options']['A'])
+        st.write("**C.** " + question['options']['C'][:150] + "..." if len(question['options']['C']) > 150 else question['options']['C'])
+    with col2:
+        st.write("**B.** " + question['options']['B'][:150] + "..." if len(question['options']['B']) > 150 else question['options']['B'])
+        st.write("**D.** " + question['options']['D'][:150] + "..." if len(question['options']['D']) > 150 else question['options']['D'])
+
+def collect_streamed_questions(stream):
+    """Preview questions as they are generated and return them all at the end"""
+    preview = st.empty()
+    questions = []
+    for question in stream:
+        questions.append(question)
+        with preview.container():
+            for i, streamed in enumerate(questions, 1):
+                render_question(i, streamed)
+    # The finished quiz is rendered with answer buttons by display_quiz
+    preview.empty()
+    return questions
+
 def display_quiz(questions):
     """Display quiz questions and collect answers"""
     if not questions:
@@ -20,16 +57,7 @@ def display_quiz(questions):
     
     answers = {}
     for i, question in enumerate(questions, 1):
-        st.write(f"\n**Question {i}:** {question['question']}")
-        
-        # Create columns for options
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write("**A.** " + question['options']['A'][:150] + "..." if len(question['options']['A']) > 150 else question['options']['A'])
-            st.write("**C.** " + question['options']['C'][:150] + "..." if len(question['options']['C']) > 150 else question['options']['C'])
-        with col2:
-            st.write("**B.** " + question['options']['B'][:150] + "..." if len(question['options']['B']) > 150 else question['options']['B'])
-            st.write("**D.** " + question['options']['D'][:150] + "..." if len(question['options']['D']) > 150 else question['options']['D'])
+        render_question(i, question)
         
         # Add some space between options and radio buttons
         st.write("")
@@ -56,48 +84,64 @@ def display_quiz(questions):
     
     return answers
 
+# Rows shown per page of the detailed history
+HISTORY_PAGE_SIZE = 20
+
 def show_performance_chart(username):
     """Show the user's performance chart"""
-    # Get user's quiz history
-    scores = get_user_scores(username)
-    if not scores:
+    # Show statistics from the running totals kept by store_quiz_result
+    stats = get_user_stats(username)
+    if not stats['total_quizzes']:
         st.info("Take your first quiz to see your performance!")
         return
     
-    # Convert scores to a pandas DataFrame
     import pandas as pd
-    df = pd.DataFrame(scores, columns=['subject', 'topic', 'difficulty', 'score', 'total', 'timestamp'])
-    df['percentage'] = (df['score'] / df['total']) * 100
     
     # Create performance chart
     st.write("#### Recent Quiz Scores")
     
-    # Bar chart for recent scores
-    chart_data = df.tail(5)  # Last 5 quizzes
+    # Bar chart for the last 5 quizzes, oldest first
+    recent, _ = get_user_score_columns(username, limit=5)
+    chart_data = pd.DataFrame(recent).iloc[::-1]
     st.bar_chart(chart_data.set_index('topic')['percentage'])
     
-    # Show statistics
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        avg_score = df['percentage'].mean()
-        st.metric("Average Score", f"{avg_score:.1f}%")
+        st.metric("Average Score", f"{stats['avg_score']:.1f}%")
     
     with col2:
-        best_score = df['percentage'].max()
-        st.metric("Best Score", f"{best_score:.1f}%")
+        st.metric("Best Score", f"{stats['highest_score']:.1f}%")
     
     with col3:
-        total_quizzes = len(df)
-        st.metric("Total Quizzes", total_quizzes)
+        st.metric("Total Quizzes", stats['total_quizzes'])
     
-    # Show detailed history in an expander
+    # Show detailed history in an expander, one page at a time
     with st.expander("View Detailed History"):
+        cursors = st.session_state.setdefault('history_cursors', [None])
+        page, next_cursor = get_user_score_columns(username, limit=HISTORY_PAGE_SIZE, before=cursors[-1])
+        df = pd.DataFrame(page)
         st.dataframe(
             df[['topic', 'subject', 'difficulty', 'score', 'total', 'percentage']].style.format({
                 'percentage': '{:.1f}%'
             })
         )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if len(cursors) > 1 and st.button("Newer"):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if next_cursor and st.button("Older"):
+                cursors.append(next_cursor)
+                st.rerun()
+
+def get_client_id():
+    """Identify the browser session for login rate limiting"""
+    # Streamlit 1.24 doesn't expose the client address, so limit per session
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
 
 def show_auth_form():
     tab1, tab2 = st.tabs(["Login", "Sign Up"])
@@ -106,12 +150,15 @@ def show_auth_form():
         email = st.text_input("Email", key="login_email")
         password = st.text_input("Password", type="password", key="login_password")
         if st.button("Login"):
-            if login_user(email, password):
-                st.session_state.user = email
-                st.success("Logged in successfully")
-                st.rerun()
-            else:
-                st.error("Invalid credentials")
+            try:
+                if login_user(email, password, client_id=get_client_id()):
+                    st.session_state.user = email
+                    st.success("Logged in successfully")
+                    st.rerun()
+                else:
+                    st.error("Invalid credentials")
+            except LoginThrottled as e:
+                st.error(str(e))
 
     with tab2:
         new_email = st.text_input("New Email", key="signup_email")
@@ -167,6 +214,7 @@ def main():
     with col2:
         if st.button("Logout"):
             st.session_state.user = None
+            st.session_state.pop('history_cursors', None)
             st.rerun()
     
     # Show performance chart
@@ -203,7 +251,12 @@ def main():
         else:
             with st.spinner("Generating your quiz... This may take a moment while we gather information."):
                 try:
-                    questions = generate_quiz_questions(subject, topic, difficulty, num_questions)
+                    questions = []
+                    if MODEL_STREAMING:
+                        questions = collect_streamed_questions(
+                            stream_model_questions(subject, topic, difficulty, num_questions))
+                    if len(questions) < num_questions:
+                        questions = generate_quiz_questions(subject, topic, difficulty, num_questions)
                     
                     if questions and len(questions) >= 5:
                         st.session_state.current_quiz = {
@@ -238,7 +291,7 @@ def main():
                         percentage = (score / total) * 100
                         
                         # Store the quiz result
-                        store_quiz_result(
+                        submit_quiz_result(
                             st.session_state.user,
                             quiz['subject'],
                             quiz['topic'],
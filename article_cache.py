@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import wiki_client
+
+# Raw Wikipedia responses live here, one JSON file per search query or page
+CACHE_DIR = Path(os.getenv("ARTICLE_CACHE_DIR", "article_cache"))
+TTL_SECONDS = 7 * 24 * 60 * 60
+MAX_BYTES = 50 * 1024 * 1024
+# Eviction trims the cache to this fraction of MAX_BYTES, so a full cache
+# isn't rescanned on every put
+EVICT_TO_FRACTION = 0.9
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_total_bytes = None
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a search query"""
+    return " ".join(query.casefold().split())
+
+def _entry_path(kind, key):
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return CACHE_DIR / kind / f"{digest}.json"
+
+def _touch(path):
+    """Record a use of path in its mtime, which drives LRU eviction"""
+    # Explicit nanosecond stamps; the kernel's own file times are too coarse
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+def _entries():
+    """All cache files as (path, size, last_used) tuples"""
+    entries = []
+    for path in CACHE_DIR.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+def _current_size():
+    global _total_bytes
+
+    if _total_bytes is None:
+        _total_bytes = sum(size for _, size, _ in _entries())
+    return _total_bytes
+
+def _evict(max_bytes):
+    """Drop least recently used files until the cache fits in max_bytes"""
+    global _total_bytes
+
+    entries = sorted(_entries(), key=lambda entry: entry[2])
+    _total_bytes = sum(size for _, size, _ in entries)
+    for path, size, _ in entries:
+        if _total_bytes <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        _total_bytes -= size
+        _stats["evictions"] += 1
+
+def get(kind, key):
+    """Return the cached value for key, or None if missing or expired"""
+    path = _entry_path(kind, key)
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    if time.time() - entry["fetched_at"] > TTL_SECONDS:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    try:
+        _touch(path)
+    except FileNotFoundError:
+        pass
+
+    with _lock:
+        _stats["hits"] += 1
+    return entry["value"]
+
+def put(kind, key, value):
+    """Store a value atomically and evict old entries if over the size cap"""
+    global _total_bytes
+
+    path = _entry_path(kind, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    payload = json.dumps({"key": key, "fetched_at": time.time(), "value": value})
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(payload)
+
+    with _lock:
+        size = _current_size()
+        try:
+            size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+        _touch(path)
+        _total_bytes = size + len(payload.encode("utf-8"))
+        if _total_bytes > MAX_BYTES:
+            _evict(int(MAX_BYTES * EVICT_TO_FRACTION))
+
+def search(query):
+    """Wikipedia search results for a query, served from cache when fresh"""
+    key = normalize_query(query)
+    results = get("search", key)
+    if results is None:
+        results = wiki_client.search(query)
+        put("search", key, results)
+    return results
+
+def fetch_extract(page_id):
+    """Plain-text extract of a page, served from cache when fresh"""
+    key = str(page_id)
+    extract = get("extract", key)
+    if extract is None:
+        extract = wiki_client.fetch_extract(page_id)
+        put("extract", key, extract)
+    return extract
+
+def stats():
+    """Hit/miss/eviction counters and the current on-disk size"""
+    with _lock:
+        result = dict(_stats)
+        result["bytes"] = _current_size()
+    lookups = result["hits"] + result["misses"]
+    result["hit_ratio"] = result["hits"] / lookups if lookups else 0.0
+    return result
+
+def clear():
+    """Remove every cached entry and reset the counters"""
+    global _total_bytes
+
+    with _lock:
+        for path, _, _ in _entries():
+            path.unlink(missing_ok=True)
+        _total_bytes = 0
+        for name in _stats:
+            _stats[name] = 0
@@ -1,42 +1,28 @@
-import sqlite3
+import database
+import login_guard
 
-DB_NAME = "users.db"
+# Accounts and progress now live in database.DB_NAME alongside quiz results;
+# the old users.db is merged in by database.init_db
 
 def signup(email, password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    database.init_db()
     try:
-        c.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, password))
-
-        conn.commit()
+        database.add_user(email, password)
         return True
-    except sqlite3.IntegrityError:
+    except ValueError:
         return False
-    finally:
-        conn.close()
 
 def login(email, password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE email=? AND password=?", (email, password))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
+    database.init_db()
+    try:
+        return database.login_user(email, password)
+    except login_guard.LoginThrottled:
+        return False
 
 def update_progress(email, score):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT progress FROM users WHERE email=?", (email,))
-    old = c.fetchone()[0]
-    new_progress = (old + score) / 2
-    c.execute("UPDATE users SET progress=? WHERE email=?", (new_progress, email))
-    conn.commit()
-    conn.close()
+    database.init_db()
+    database.update_progress(email, score)
 
 def get_user_progress(email):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT progress FROM users WHERE email=?", (email,))
-    result = c.fetchone()
-    conn.close()
-    return result[0] if result else 0
\ No newline at end of file
+    database.init_db()
+    return database.get_user_progress(email)
\ No newline at end of file
@@ -0,0 +1,40 @@
+import sys
+import time
+
+from quiz_generator import clean_text
+from test_clean_text import legacy_clean_text
+
+SAMPLE = (
+    "== History ==\n"
+    "Photosynthesis (from Ancient Greek phôs, \"light\", and sýnthesis) is a process[1] used by "
+    "plants and other organisms to convert light energy into chemical energy[2][3] that , "
+    "through cellular respiration , can later be released to fuel the organism's activities.\n"
+    "Most plants, algae & cyanobacteria perform photosynthesis; such organisms are called "
+    "photoautotrophs.[4] The process is — by far — the largest source of free energy on Earth!\n\n"
+)
+
+def load_text(path=None, megabytes=20):
+    """Read a plain-text Wikipedia dump, or build one from SAMPLE"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return SAMPLE * (megabytes * 2**20 // len(SAMPLE))
+
+def run_benchmark(path=None):
+    text = load_text(path)
+    mb = len(text.encode("utf-8")) / 2**20
+    print("\n=== clean_text Benchmark ===\n")
+    print(f"Input: {path or 'synthetic sample'} ({mb:.1f} MB)\n")
+    print(f"{'version':>10} {'seconds':>9} {'MB/s':>8}")
+
+    results = {}
+    for name, clean in [("five-pass", legacy_clean_text), ("two-pass", clean_text)]:
+        start = time.perf_counter()
+        results[name] = clean(text)
+        seconds = time.perf_counter() - start
+        print(f"{name:>10} {seconds:>9.2f} {mb / seconds:>8.1f}")
+
+    print(f"\nOutputs identical: {results['five-pass'] == results['two-pass']}")
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,77 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import database
+
+# Each user keeps the same history length, so only the table grows
+ROWS_PER_USER = 50
+LOOKUPS = 200
+
+def insert_rows(conn, start, count):
+    """Append count synthetic quiz results, ROWS_PER_USER per user"""
+    base = datetime(2024, 1, 1)
+    rows = (
+        (
+            f"user{i // ROWS_PER_USER}@example.com",
+            "Biology",
+            f"Topic {i % 50}",
+            "beginner",
+            random.randint(0, 5),
+            5,
+            base + timedelta(seconds=i),
+        )
+        for i in range(start, start + count)
+    )
+    conn.executemany('''
+        INSERT INTO quiz_results
+        (user_email, subject, topic, difficulty, score, total_questions, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    # Rebuild the running totals the same way migration 2 backfills them
+    for statement in database.MIGRATIONS[1][2:]:
+        conn.execute(statement)
+    conn.commit()
+
+def time_dashboard(users, lookups=LOOKUPS):
+    """Average milliseconds for one user's stats plus score history"""
+    start = time.perf_counter()
+    for _ in range(lookups):
+        email = f"user{random.randrange(users)}@example.com"
+        database.get_user_stats(email)
+        database.get_user_scores(email)
+    return (time.perf_counter() - start) / lookups * 1000
+
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    print("\n=== Dashboard Query Benchmark ===\n")
+    print(f"{'rows':>10} {'no index (ms)':>15} {'indexed (ms)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+        conn = database.get_connection()
+
+        loaded = 0
+        for size in sizes:
+            insert_rows(conn, loaded, size - loaded)
+            loaded = size
+
+            conn.execute('DROP INDEX IF EXISTS idx_quiz_results_user_timestamp')
+            users = size // ROWS_PER_USER
+            before = time_dashboard(users, lookups=min(LOOKUPS, 20))
+
+            for statement in database.MIGRATIONS[0]:
+                conn.execute(statement)
+            conn.execute('ANALYZE')
+            after = time_dashboard(users)
+
+            print(f"{size:>10} {before:>15.2f} {after:>14.2f}")
+
+        database.close_connections()
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or (10_000, 100_000, 1_000_000)
+    run_benchmark(sizes)
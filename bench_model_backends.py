@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import sys
+import time
+
+PROMPTS = [
+    "Generate a multiple choice question about photosynthesis in plant cells.",
+    "Generate a multiple choice question about the causes of the French Revolution.",
+    "Generate a multiple choice question about binary search trees.",
+    "Generate a multiple choice question about the water cycle.",
+]
+ROUNDS = 3
+MAX_LENGTH = 128
+
+def measure(backend, results):
+    """Load one backend in this process and time generation on the prompts"""
+    # Import here so each backend starts from a clean process
+    from model_registry import resident_bytes
+    import quiz_generator
+
+    rss_start = resident_bytes()
+    start = time.perf_counter()
+    tokenizer, model = quiz_generator.load_seq2seq(quiz_generator.MODEL_NAME, backend,
+                                                   token=os.getenv("HUGGINGFACE_API_KEY"))
+    load_seconds = time.perf_counter() - start
+
+    # Warm up once so lazy initialisation isn't counted as generation
+    quiz_generator.generate_batch(tokenizer, model, [(PROMPTS[0], MAX_LENGTH)])
+
+    tokens = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for prompt in PROMPTS:
+            text = quiz_generator.generate_batch(tokenizer, model, [(prompt, MAX_LENGTH)])[0]
+            tokens += len(tokenizer(text).input_ids)
+    elapsed = time.perf_counter() - start
+
+    rss_end = resident_bytes()
+    # resident_bytes() is None where the platform doesn't report it
+    rss = None if rss_start is None or rss_end is None else rss_end - rss_start
+    results.put((backend, load_seconds, tokens / elapsed, rss))
+
+def run_benchmark(backends=("fp32", "int8", "onnx")):
+    print("\n=== Model Backend Benchmark (CPU) ===\n")
+    print(f"{'backend':>8} {'load (s)':>9} {'tokens/s':>9} {'RSS (MB)':>9}")
+
+    # Spawn a fresh interpreter per backend so resident memory isn't shared
+    context = multiprocessing.get_context("spawn")
+    for backend in backends:
+        results = context.Queue()
+        process = context.Process(target=measure, args=(backend, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0 or results.empty():
+            print(f"{backend:>8} {'failed':>9}")
+            continue
+        _, load_seconds, tokens_per_second, rss = results.get()
+        rss_text = "n/a" if rss is None else f"{rss / 2**20:.0f}"
+        print(f"{backend:>8} {load_seconds:>9.1f} {tokens_per_second:>9.1f} {rss_text:>9}")
+
+if __name__ == "__main__":
+    backends = sys.argv[1:] or ("fp32", "int8", "onnx")
+    run_benchmark(backends)
@@ -0,0 +1,122 @@
+import time
+
+import nlp_resources
+from quiz_generator import (build_phrase_index, extract_key_phrases, generate_template_questions,
+                            other_key_phrases, section_sentences, tag_sentences)
+
+SAMPLE_SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose.",
+    "Chlorophyll absorbs mostly blue and red wavelengths of visible light.",
+    "The Calvin cycle fixes atmospheric carbon dioxide into organic molecules.",
+    "Plant cells contain chloroplasts surrounded by a double membrane.",
+    "Oxygen is released as a byproduct when water molecules are split.",
+    "The light reactions take place in the thylakoid membranes of the chloroplast.",
+]
+
+def make_sentences(count):
+    """Build a synthetic article with the given number of sentences"""
+    return [SAMPLE_SENTENCES[i % len(SAMPLE_SENTENCES)].replace(".", f" number {i}.") for i in range(count)]
+
+def legacy_distractor_pools(sentences):
+    """Old behaviour: re-tag every other sentence for each candidate sentence"""
+    from nltk.tokenize import word_tokenize
+    from nltk.tag import pos_tag
+
+    pools = []
+    for sentence in sentences:
+        extract_key_phrases(pos_tag(word_tokenize(sentence)))
+        other = []
+        for s in sentences:
+            if s != sentence:
+                other.extend(extract_key_phrases(pos_tag(word_tokenize(s))))
+        pools.append(other)
+    return pools
+
+def legacy_template_questions(content, num_questions):
+    """Old generation loop: tag each candidate, then re-tag the whole
+    article for its distractors, one tagger call per sentence"""
+    def phrases(sentence):
+        tokens = nlp_resources.word_tokenize(sentence)
+        return extract_key_phrases(nlp_resources.pos_tag_sents([tokens])[0])
+
+    sentences = section_sentences(content)
+    questions = []
+    for sentence in sentences:
+        if len(questions) >= num_questions:
+            break
+        key_phrases = phrases(sentence)
+        if not key_phrases:
+            continue
+        distractors = [p for s in sentences if s != sentence for p in phrases(s)][:3]
+        questions.append((key_phrases[0], sentence, distractors))
+    return questions
+
+def run_generation_benchmark(sentence_counts=(5, 10, 20, 40)):
+    """Time question generation end to end against article length"""
+    print("\n=== Template Generation Benchmark ===\n")
+    print(f"{'sentences':>10} {'before (s)':>12} {'after (s)':>12} {'speedup':>10}")
+
+    nlp_resources.warm_up()
+    for count in sentence_counts:
+        content = " ".join(make_sentences(count))
+
+        start = time.perf_counter()
+        legacy_template_questions(content, count)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        generate_template_questions(content, "Biology", "Photosynthesis", "beginner", count)
+        after = time.perf_counter() - start
+
+        print(f"{count:>10} {before:>12.4f} {after:>12.4f} {before / after:>9.1f}x")
+
+def indexed_distractor_pools(sentences):
+    """New behaviour: tag once, then draw from the phrase index"""
+    index = build_phrase_index(sentences)
+    return [other_key_phrases(index, position) for position in range(len(index))]
+
+def per_sentence_tagging(sentences):
+    """Old behaviour: one tagger call per sentence"""
+    from nltk.tokenize import word_tokenize
+    from nltk.tag import pos_tag
+
+    return [pos_tag(word_tokenize(sentence)) for sentence in sentences]
+
+def run_tagging_benchmark(sentence_counts=(5, 10, 20, 40)):
+    print("\n=== Batched Tagging Benchmark ===\n")
+    print(f"{'sentences':>10} {'per-call (s)':>14} {'batched (s)':>12} {'speedup':>10}")
+
+    for count in sentence_counts:
+        sentences = make_sentences(count)
+
+        start = time.perf_counter()
+        per_sentence_tagging(sentences)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tag_sentences(sentences)
+        after = time.perf_counter() - start
+
+        print(f"{count:>10} {before:>14.4f} {after:>12.4f} {before / after:>9.1f}x")
+
+def run_benchmark(sentence_counts=(5, 10, 20, 40)):
+    print("\n=== Phrase Index Benchmark ===\n")
+    print(f"{'sentences':>10} {'before (s)':>12} {'after (s)':>12} {'speedup':>10}")
+
+    for count in sentence_counts:
+        sentences = make_sentences(count)
+
+        start = time.perf_counter()
+        legacy_distractor_pools(sentences)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed_distractor_pools(sentences)
+        after = time.perf_counter() - start
+
+        print(f"{count:>10} {before:>12.4f} {after:>12.4f} {before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    run_generation_benchmark()
+    run_benchmark()
+    run_tagging_benchmark()
@@ -0,0 +1,74 @@
+import sys
+import time
+
+from quiz_parser import QuizParser, parse_quiz_text, validate_question
+
+QUESTION = (
+    "Q{n}. Which statement best describes item number {n} in the reading?\n"
+    "A. The first plausible option\n"
+    "B. The second plausible option\n"
+    "C. The third plausible option\n"
+    "D. The fourth plausible option\n"
+    "Answer: C\n"
+)
+
+def legacy_parse(text):
+    """The line-splitting parser quiz_parser replaced, kept for comparison"""
+    questions = []
+    current = {}
+
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    for line in lines:
+        if line.startswith(("Q", "Question")):
+            if current and validate_question(current):
+                questions.append(current)
+            current = {"question": line.split(".", 1)[-1].strip(), "options": []}
+        elif line.startswith(("A.", "B.", "C.", "D.")):
+            option = line.split(".", 1)
+            if len(option) == 2:
+                current.setdefault("options", []).append(line)
+        elif "ANSWER:" in line.upper():
+            answer = line.upper().replace("ANSWER:", "").strip()
+            if answer in ["A", "B", "C", "D"]:
+                current["answer"] = answer
+
+    if current and validate_question(current):
+        questions.append(current)
+
+    return questions
+
+def streamed_parse(text, chunk_size):
+    """Feed text the way a token streamer would, a few characters at a time"""
+    parser = QuizParser()
+    questions = []
+    for start in range(0, len(text), chunk_size):
+        questions.extend(parser.feed(text[start:start + chunk_size]))
+    return questions + parser.close()
+
+def timed(parse, text):
+    start = time.perf_counter()
+    questions = parse(text)
+    return time.perf_counter() - start, len(questions)
+
+def run_benchmark(megabytes=(1, 4, 16)):
+    print("\n=== Quiz Parser Benchmark ===\n")
+    print(f"{'MB':>4} {'parser':>18} {'questions':>10} {'seconds':>9} {'MB/s':>8}")
+
+    for size in megabytes:
+        count = size * 2**20 // len(QUESTION.format(n=0))
+        text = "".join(QUESTION.format(n=n) for n in range(count))
+        mb = len(text) / 2**20
+
+        parsers = [
+            ("legacy", legacy_parse),
+            ("state machine", parse_quiz_text),
+            ("streamed, 16 chr", lambda text: streamed_parse(text, 16)),
+        ]
+        for name, parse in parsers:
+            seconds, questions = timed(parse, text)
+            print(f"{size:>4} {name:>18} {questions:>10} {seconds:>9.2f} {mb / seconds:>8.1f}")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or (1, 4, 16)
+    run_benchmark(sizes)
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import database
+from result_writer import ResultWriter
+
+THREADS = 8
+
+def submit_burst(submit, total):
+    """Submit total results spread over THREADS threads; return seconds taken"""
+    per_thread = total // THREADS
+
+    def worker(n):
+        for i in range(per_thread):
+            submit(f"student{n}@example.com", "Biology", f"Topic {i % 20}", "beginner", i % 6, 5)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, per_thread * THREADS
+
+def run_benchmark(total=20_000):
+    print("\n=== Result Writer Load Test ===\n")
+    print(f"{'mode':>14} {'results':>9} {'seconds':>9} {'results/s':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+
+        elapsed, count = submit_burst(database.store_quiz_result, total)
+        print(f"{'synchronous':>14} {count:>9} {elapsed:>9.2f} {count / elapsed:>11.0f}")
+
+        writer = ResultWriter()
+        writer.start()
+        queued, count = submit_burst(writer.submit, total)
+        # Count the time until the last batch is committed, not just queued
+        start = time.perf_counter()
+        writer.close()
+        elapsed = queued + time.perf_counter() - start
+        print(f"{'write-behind':>14} {count:>9} {elapsed:>9.2f} {count / elapsed:>11.0f}")
+        print(f"\nWriter stats: {writer.stats()}")
+
+        database.close_connections()
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    run_benchmark(total)
@@ -0,0 +1,82 @@
+import sqlite3
+import threading
+import weakref
+
+class _Lease:
+    """A pooled connection held by one thread, released when the thread ends"""
+
+    def __init__(self, release, path, conn):
+        self.conn = conn
+        # Runs when the thread's locals are cleared at thread exit
+        self._finalizer = weakref.finalize(self, release, path, conn)
+
+    def close(self):
+        self._finalizer.detach()
+        self.conn.close()
+
+class ConnectionPool:
+    """SQLite connections shared across threads, one thread at a time.
+
+    Streamlit runs every rerun on a fresh thread, so per-thread connections
+    would be reopened (and re-tuned) on every interaction. Instead each
+    thread leases one connection per database path on first use, taken
+    from the idle pool or opened and tuned with pragmas when it is empty,
+    and the lease returns it to the pool when the thread ends. Up to
+    max_idle connections per path are kept for later threads.
+    """
+
+    def __init__(self, pragmas=(), max_idle=8, timeout=30):
+        self.pragmas = list(pragmas)
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def get(self, path):
+        """Return this thread's connection to path; callers must not close it"""
+        leases = getattr(self._local, "leases", None)
+        if leases is None:
+            leases = self._local.leases = {}
+
+        lease = leases.get(path)
+        if lease is None:
+            with self._lock:
+                idle = self._idle.get(path)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                # Pooled connections move between threads, one thread at a time
+                conn = sqlite3.connect(path, timeout=self.timeout, check_same_thread=False)
+                for pragma in self.pragmas:
+                    conn.execute(pragma)
+            lease = leases[path] = _Lease(self._release, path, conn)
+        return lease.conn
+
+    def _release(self, path, conn):
+        """Return a connection from a finished thread to the idle pool"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(path, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close the current thread's connections and every idle one"""
+        leases = getattr(self._local, "leases", {})
+        for lease in leases.values():
+            lease.close()
+        leases.clear()
+
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
@@ -1,9 +1,156 @@
+import hmac
+import os
 import sqlite3
+import threading
 from datetime import datetime
 
+import bcrypt
+
+import login_guard
+from connection_pool import ConnectionPool
+
+DB_NAME = 'quiz_app.db'
+
+# Users database formerly used by auth.py; merged into DB_NAME by init_db
+LEGACY_USERS_DB = 'users.db'
+
+# bcrypt cost for new hashes; stored hashes below it are upgraded at login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Connection tuning applied once to every pooled connection
+PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-16000',
+    'PRAGMA temp_store=MEMORY',
+]
+
+# Schema changes applied in order on top of create_schema; the number of
+# migrations already applied is stored in PRAGMA user_version
+MIGRATIONS = [
+    # 1: per-user history and stats are served from an index range scan
+    [
+        'CREATE INDEX IF NOT EXISTS idx_quiz_results_user_timestamp '
+        'ON quiz_results(user_email, timestamp)',
+    ],
+    # 2: running per-user and per-subject totals, backfilled from history
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_email TEXT PRIMARY KEY,
+            total_quizzes INTEGER NOT NULL,
+            percentage_sum REAL NOT NULL,
+            best_percentage REAL NOT NULL,
+            last_quiz_at TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_subject_stats (
+            user_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            total_quizzes INTEGER NOT NULL,
+            percentage_sum REAL NOT NULL,
+            best_percentage REAL NOT NULL,
+            PRIMARY KEY (user_email, subject)
+        )
+        ''',
+        '''
+        INSERT OR REPLACE INTO user_stats
+        -- Quizzes with no questions count as 0%, as in store_quiz_result
+        SELECT user_email, COUNT(*),
+               SUM(CASE WHEN total_questions > 0 THEN CAST(score AS FLOAT) / total_questions * 100 ELSE 0 END),
+               MAX(CASE WHEN total_questions > 0 THEN CAST(score AS FLOAT) / total_questions * 100 ELSE 0 END),
+               MAX(timestamp)
+        FROM quiz_results
+        GROUP BY user_email
+        ''',
+        '''
+        INSERT OR REPLACE INTO user_subject_stats
+        SELECT user_email, subject, COUNT(*),
+               SUM(CASE WHEN total_questions > 0 THEN CAST(score AS FLOAT) / total_questions * 100 ELSE 0 END),
+               MAX(CASE WHEN total_questions > 0 THEN CAST(score AS FLOAT) / total_questions * 100 ELSE 0 END)
+        FROM quiz_results
+        GROUP BY user_email, subject
+        ''',
+    ],
+    # 3: progress tracked by auth.update_progress, and a record of merged databases
+    [
+        'ALTER TABLE users ADD COLUMN progress REAL NOT NULL DEFAULT 0',
+        '''
+        CREATE TABLE IF NOT EXISTS merged_databases (
+            path TEXT PRIMARY KEY,
+            merged_at TIMESTAMP NOT NULL
+        )
+        ''',
+    ],
+]
+
+INSERT_RESULT_SQL = '''
+    INSERT INTO quiz_results
+    (user_email, subject, topic, difficulty, score, total_questions, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Fold one result (user_email, percentage, timestamp) into user_stats
+UPDATE_USER_STATS_SQL = '''
+    INSERT INTO user_stats (user_email, total_quizzes, percentage_sum, best_percentage, last_quiz_at)
+    VALUES (?1, 1, ?2, ?2, ?3)
+    ON CONFLICT(user_email) DO UPDATE SET
+        total_quizzes = total_quizzes + 1,
+        percentage_sum = percentage_sum + excluded.percentage_sum,
+        best_percentage = MAX(best_percentage, excluded.best_percentage),
+        last_quiz_at = excluded.last_quiz_at
+'''
+
+# Fold one result (user_email, subject, percentage) into user_subject_stats
+UPDATE_SUBJECT_STATS_SQL = '''
+    INSERT INTO user_subject_stats (user_email, subject, total_quizzes, percentage_sum, best_percentage)
+    VALUES (?1, ?2, 1, ?3, ?3)
+    ON CONFLICT(user_email, subject) DO UPDATE SET
+        total_quizzes = total_quizzes + 1,
+        percentage_sum = percentage_sum + excluded.percentage_sum,
+        best_percentage = MAX(best_percentage, excluded.best_percentage)
+'''
+
+# Idle connections kept per database for reuse by later threads
+POOL_SIZE = 8
+
+_pool = ConnectionPool(PRAGMAS, POOL_SIZE)
+_init_lock = threading.Lock()
+_initialized = set()
+
+def get_connection():
+    """Return this thread's pooled connection to DB_NAME
+    
+    Connections are tuned with PRAGMAS once when opened and returned to
+    the pool when the thread ends, so callers must not close them.
+    """
+    return _pool.get(DB_NAME)
+
+def close_connections():
+    """Close the current thread's connections and every idle pooled one"""
+    _pool.close()
+
 def init_db():
-    """Initialize the SQLite database with required tables"""
-    conn = sqlite3.connect('quiz_app.db')
+    """Initialize the SQLite database with required tables
+    
+    The schema is only created once per database per process, so this is
+    cheap to call on every Streamlit rerun.
+    """
+    if DB_NAME in _initialized:
+        return
+    
+    with _init_lock:
+        if DB_NAME in _initialized:
+            return
+        conn = get_connection()
+        create_schema(conn)
+        migrate(conn)
+        merge_users_db(conn)
+        _initialized.add(DB_NAME)
+
+def create_schema(conn):
+    """Create the tables if they don't exist yet"""
     c = conn.cursor()
     
     # Create users table
@@ -31,58 +178,216 @@ def init_db():
     ''')
     
     conn.commit()
-    conn.close()
+
+def migrate(conn):
+    """Apply any migrations newer than the database's user_version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.execute('BEGIN')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def merge_users_db(conn, path=None):
+    """Copy accounts from the legacy users.db into this database, once
+    
+    Existing accounts win over legacy ones with the same email. The old
+    average_score (or progress) column becomes users.progress. Returns
+    the number of accounts copied.
+    """
+    path = path or LEGACY_USERS_DB
+    if not os.path.exists(path):
+        return 0
+    
+    key = os.path.abspath(path)
+    if conn.execute('SELECT 1 FROM merged_databases WHERE path = ?', (key,)).fetchone():
+        return 0
+    
+    conn.execute('ATTACH DATABASE ? AS legacy', (path,))
+    try:
+        columns = {row[1] for row in conn.execute('PRAGMA legacy.table_info(users)')}
+        if 'progress' in columns:
+            progress = 'COALESCE(progress, 0)'
+        elif 'average_score' in columns:
+            progress = 'COALESCE(average_score, 0)'
+        else:
+            progress = '0'
+        
+        conn.execute('BEGIN')
+        merged = 0
+        if columns:
+            merged = conn.execute(f'''
+                INSERT OR IGNORE INTO users (email, password, progress)
+                SELECT email, password, {progress}
+                FROM legacy.users
+                WHERE password IS NOT NULL
+            ''').rowcount
+        conn.execute('INSERT INTO merged_databases (path, merged_at) VALUES (?, ?)', (key, datetime.now()))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute('DETACH DATABASE legacy')
+    
+    if merged:
+        print(f"Merged {merged} users from {path}")
+    return merged
+
+def _password_bytes(password):
+    # bcrypt only looks at the first 72 bytes; newer releases reject longer input
+    return password.encode('utf-8')[:72]
+
+def hash_password(password, rounds=None):
+    """Hash a password with bcrypt at the given (or configured) cost"""
+    salt = bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode('utf-8')
+
+def is_bcrypt_hash(stored):
+    return stored.startswith(('$2a$', '$2b$', '$2y$'))
+
+def verify_password(password, stored):
+    """Check a password against a bcrypt hash or a legacy plaintext value"""
+    if is_bcrypt_hash(stored):
+        return bcrypt.checkpw(_password_bytes(password), stored.encode('utf-8'))
+    return hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+
+def password_needs_rehash(stored, rounds=None):
+    """True for plaintext values and hashes cheaper than the configured cost"""
+    if not is_bcrypt_hash(stored):
+        return True
+    return int(stored.split('$')[2]) < (rounds or BCRYPT_ROUNDS)
 
 def add_user(email, password):
     """Add a new user to the database"""
-    conn = sqlite3.connect('quiz_app.db')
+    conn = get_connection()
     c = conn.cursor()
     
     try:
-        c.execute('INSERT INTO users (email, password) VALUES (?, ?)', (email, password))
+        c.execute('INSERT INTO users (email, password) VALUES (?, ?)', (email, hash_password(password)))
         conn.commit()
     except sqlite3.IntegrityError:
-        conn.close()
+        conn.rollback()
         raise ValueError("User already exists")
-    finally:
-        conn.close()
 
-def login_user(email, password):
-    """Verify user credentials"""
-    conn = sqlite3.connect('quiz_app.db')
-    c = conn.cursor()
+def login_user(email, password, client_id=None):
+    """Verify user credentials
     
-    c.execute('SELECT password FROM users WHERE email = ?', (email,))
-    result = c.fetchone()
+    Credentials verified recently against the same stored hash are accepted
+    from memory without a bcrypt check. Other attempts are rate limited by
+    login_guard, which raises LoginThrottled once a limit is hit.
+    """
+    return login_guard.check_login(email, password, client_id, _stored_password, _verify_credentials)
+
+def _stored_password(email):
+    """The stored password hash for email, or None if there is no such user"""
+    result = get_connection().execute('SELECT password FROM users WHERE email = ?', (email,)).fetchone()
+    return result[0] if result else None
+
+def _verify_credentials(email, password, stored):
+    """Check a password against its stored hash
     
-    conn.close()
+    A successful check also upgrades the stored password if it is still
+    plaintext or was hashed below BCRYPT_ROUNDS, so the cost can be raised
+    without an offline migration. Returns the hash stored afterwards, or
+    None if the check failed.
+    """
+    if stored is None or not verify_password(password, stored):
+        return None
     
-    if result and result[0] == password:
-        return True
-    return False
+    if password_needs_rehash(stored):
+        conn = get_connection()
+        try:
+            # Only replace the hash we verified, in case it changed meanwhile
+            rehashed = hash_password(password)
+            c = conn.execute('UPDATE users SET password = ? WHERE email = ? AND password = ?',
+                             (rehashed, email, stored))
+            conn.commit()
+            if c.rowcount:
+                stored = rehashed
+        except Exception as e:
+            print(f"Error rehashing password: {e}")
+            conn.rollback()
+    return stored
 
 def store_quiz_result(user_email, subject, topic, difficulty, score, total_questions):
-    """Store a quiz result in the database"""
-    conn = sqlite3.connect('quiz_app.db')
+    """Store a quiz result and fold it into the user's running stats"""
+    conn = get_connection()
     c = conn.cursor()
+    timestamp = datetime.now()
+    percentage = score / total_questions * 100 if total_questions else 0
     
     try:
-        c.execute('''
-            INSERT INTO quiz_results 
-            (user_email, subject, topic, difficulty, score, total_questions, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (user_email, subject, topic, difficulty, score, total_questions, datetime.now()))
+        # The result row and both stats rows commit together or not at all
+        c.execute(INSERT_RESULT_SQL, (user_email, subject, topic, difficulty, score, total_questions, timestamp))
+        c.execute(UPDATE_USER_STATS_SQL, (user_email, percentage, timestamp))
+        c.execute(UPDATE_SUBJECT_STATS_SQL, (user_email, subject, percentage))
         conn.commit()
     except Exception as e:
         print(f"Error storing quiz result: {e}")
         conn.rollback()
-    finally:
-        conn.close()
+
+def store_quiz_results(results):
+    """Store a batch of quiz results in a single transaction
+    
+    Each result is a (user_email, subject, topic, difficulty, score,
+    total_questions, timestamp) tuple. Raises on failure, leaving nothing
+    from the batch stored.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    
+    user_updates = []
+    subject_updates = []
+    for user_email, subject, topic, difficulty, score, total_questions, timestamp in results:
+        percentage = score / total_questions * 100 if total_questions else 0
+        user_updates.append((user_email, percentage, timestamp))
+        subject_updates.append((user_email, subject, percentage))
+    
+    try:
+        c.executemany(INSERT_RESULT_SQL, results)
+        c.executemany(UPDATE_USER_STATS_SQL, user_updates)
+        c.executemany(UPDATE_SUBJECT_STATS_SQL, subject_updates)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return len(results)
+
+def update_progress(email, score):
+    """Fold a new score into the user's running progress value"""
+    conn = get_connection()
+    
+    try:
+        conn.execute('UPDATE users SET progress = (progress + ?) / 2 WHERE email = ?', (score, email))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def get_user_progress(email):
+    """Get the user's running progress value (0 for unknown users)"""
+    c = get_connection().cursor()
+    
+    c.execute('SELECT progress FROM users WHERE email = ?', (email,))
+    result = c.fetchone()
+    
+    return result[0] if result else 0
+
+def get_user_score(email):
+    """Average score shown by charts.py; the running progress value"""
+    return get_user_progress(email)
 
 def get_user_scores(user_email):
     """Get all quiz scores for a user"""
-    conn = sqlite3.connect('quiz_app.db')
-    c = conn.cursor()
+    c = get_connection().cursor()
     
     c.execute('''
         SELECT subject, topic, difficulty, score, total_questions, timestamp
@@ -92,39 +397,107 @@ def get_user_scores(user_email):
     ''', (user_email,))
     
     results = c.fetchall()
-    conn.close()
     
     return results
 
-def get_user_stats(user_email):
-    """Get user statistics"""
-    conn = sqlite3.connect('quiz_app.db')
-    c = conn.cursor()
+def get_user_scores_page(user_email, limit=20, before=None):
+    """Get one page of a user's quiz scores, newest first
     
-    # Get total quizzes taken
-    c.execute('SELECT COUNT(*) FROM quiz_results WHERE user_email = ?', (user_email,))
-    total_quizzes = c.fetchone()[0]
+    Pass the returned cursor as before to fetch the next (older) page; the
+    cursor is None once there are no older rows. Each page is a range scan
+    of the (user_email, timestamp) index, so deep pages cost the same as
+    the first one.
+    """
+    c = get_connection().cursor()
     
-    # Get average score
-    c.execute('''
-        SELECT AVG(CAST(score AS FLOAT) / total_questions * 100)
-        FROM quiz_results
-        WHERE user_email = ?
-    ''', (user_email,))
-    avg_score = c.fetchone()[0] or 0
+    if before is None:
+        c.execute('''
+            SELECT subject, topic, difficulty, score, total_questions, timestamp, id
+            FROM quiz_results
+            WHERE user_email = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ''', (user_email, limit + 1))
+    else:
+        c.execute('''
+            SELECT subject, topic, difficulty, score, total_questions, timestamp, id
+            FROM quiz_results
+            WHERE user_email = ? AND (timestamp, id) < (?, ?)
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ''', (user_email, before[0], before[1], limit + 1))
+    
+    rows = c.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1][5], rows[-1][6])
+    
+    return [row[:6] for row in rows], next_cursor
+
+def get_user_score_columns(user_email, limit=20, before=None):
+    """Get one page of scores as numpy columns ready for a pandas DataFrame
+    
+    Returns (columns, next_cursor) where columns maps subject, topic,
+    difficulty, score, total, percentage and timestamp to arrays.
+    """
+    import numpy as np
+    
+    rows, next_cursor = get_user_scores_page(user_email, limit, before)
+    subject, topic, difficulty, score, total, timestamp = zip(*rows) if rows else ((),) * 6
+    
+    score = np.array(score, dtype=np.int64)
+    total = np.array(total, dtype=np.int64)
+    percentage = np.divide(score * 100.0, total, out=np.zeros(len(score)), where=total > 0)
+    
+    columns = {
+        'subject': np.array(subject, dtype=object),
+        'topic': np.array(topic, dtype=object),
+        'difficulty': np.array(difficulty, dtype=object),
+        'score': score,
+        'total': total,
+        'percentage': percentage,
+        'timestamp': np.array(timestamp, dtype=object),
+    }
+    return columns, next_cursor
+
+def get_user_stats(user_email):
+    """Get user statistics from the running totals in user_stats"""
+    c = get_connection().cursor()
     
-    # Get highest score
     c.execute('''
-        SELECT MAX(CAST(score AS FLOAT) / total_questions * 100)
-        FROM quiz_results
+        SELECT total_quizzes, percentage_sum, best_percentage
+        FROM user_stats
         WHERE user_email = ?
     ''', (user_email,))
-    highest_score = c.fetchone()[0] or 0
+    row = c.fetchone()
     
-    conn.close()
+    if not row:
+        return {'total_quizzes': 0, 'avg_score': 0, 'highest_score': 0}
     
+    total_quizzes, percentage_sum, highest_score = row
     return {
         'total_quizzes': total_quizzes,
-        'avg_score': round(avg_score, 1),
+        'avg_score': round(percentage_sum / total_quizzes, 1),
         'highest_score': round(highest_score, 1)
+    }
+
+def get_user_subject_stats(user_email):
+    """Get per-subject quiz count, average and best score for a user"""
+    c = get_connection().cursor()
+    
+    c.execute('''
+        SELECT subject, total_quizzes, percentage_sum, best_percentage
+        FROM user_subject_stats
+        WHERE user_email = ?
+        ORDER BY subject
+    ''', (user_email,))
+    
+    return {
+        subject: {
+            'total_quizzes': total_quizzes,
+            'avg_score': round(percentage_sum / total_quizzes, 1),
+            'highest_score': round(best_percentage, 1)
+        }
+        for subject, total_quizzes, percentage_sum, best_percentage in c.fetchall()
     }
\ No newline at end of file
@@ -1,7 +1,4 @@
-import nltk
+from nlp_resources import ensure_resources
 
 # Download required NLTK data
-nltk.download('punkt')
-nltk.download('averaged_perceptron_tagger_eng')
-nltk.download('wordnet')
-nltk.download('stopwords')
+ensure_resources()
@@ -8,5 +8,9 @@ import subprocess
 import sys
 
 if __name__ == "__main__":
+    # Make sure NLTK data is on disk before the app starts serving quizzes
+    from nlp_resources import ensure_resources
+    ensure_resources()
+    
     # Run the app.py file with streamlit
     subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"])
\ No newline at end of file
@@ -0,0 +1,151 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Each email per client, and each client, may make LOGIN_BURST password
+# checks at once, refilled at LOGIN_REFILL_PER_SECOND
+LOGIN_BURST = 5
+LOGIN_REFILL_PER_SECOND = 5 / 60
+# Each email across every client gets a larger burst at the same rate, so
+# opening new sessions doesn't buy more guesses at one account
+ACCOUNT_LOGIN_BURST = 20
+# Password checks allowed to run at once, and how long an attempt waits
+# for one of those slots before it is throttled. This bounds bcrypt work
+# process-wide without a shared token bucket that one client could drain
+# to lock out every other user
+MAX_CONCURRENT_CHECKS = max(1, (os.cpu_count() or 2) // 2)
+CHECK_WAIT_SECONDS = 2
+# How long a verified email/password pair skips the bcrypt check
+SESSION_TTL_SECONDS = 15 * 60
+# Keys remembered by each structure before the least recent are dropped
+MAX_TRACKED_KEYS = 10000
+
+class LoginThrottled(ValueError):
+    """Raised when a login attempt is rejected by the rate limiter"""
+
+class TokenBucketLimiter:
+    """In-memory token bucket per key with bounded key tracking"""
+
+    def __init__(self, capacity=LOGIN_BURST, refill_per_second=LOGIN_REFILL_PER_SECOND):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def _refilled(self, key, now):
+        tokens, updated = self._buckets.pop(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+
+    def allow(self, *keys):
+        """Take one token from every key's bucket, or none if any is empty"""
+        now = time.monotonic()
+        with self._lock:
+            levels = [(key, self._refilled(key, now)) for key in keys]
+            allowed = all(tokens >= 1 for _, tokens in levels)
+            for key, tokens in levels:
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            while len(self._buckets) > MAX_TRACKED_KEYS:
+                self._buckets.popitem(last=False)
+        return allowed
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+class VerifiedSessionCache:
+    """Short-lived record of recently verified email/password pairs.
+
+    Only a keyed HMAC of the password and the stored hash it was checked
+    against is kept, under a secret that never leaves the process, so the
+    cache can't be used to recover passwords. A password changed anywhere,
+    even by another process, changes the stored hash and so misses.
+    """
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _digest(self, email, password, stored_hash):
+        message = f"{email}\0{password}\0{stored_hash}".encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def has(self, email):
+        """Whether email has an unexpired entry worth checking"""
+        with self._lock:
+            entry = self._entries.get(email)
+        return entry is not None and entry[1] >= time.monotonic()
+
+    def check(self, email, password, stored_hash):
+        with self._lock:
+            entry = self._entries.get(email)
+        if entry is None or entry[1] < time.monotonic():
+            return False
+        return hmac.compare_digest(entry[0], self._digest(email, password, stored_hash))
+
+    def add(self, email, password, stored_hash):
+        entry = (self._digest(email, password, stored_hash), time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries.pop(email, None)
+            self._entries[email] = entry
+            while len(self._entries) > MAX_TRACKED_KEYS:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+limiter = TokenBucketLimiter()
+account_limiter = TokenBucketLimiter(ACCOUNT_LOGIN_BURST, LOGIN_REFILL_PER_SECOND)
+check_slots = threading.BoundedSemaphore(MAX_CONCURRENT_CHECKS)
+sessions = VerifiedSessionCache()
+
+def check_login(email, password, client_id, lookup, verify):
+    """Check credentials behind the session cache and rate limiters
+
+    lookup(email) returns the stored password hash (or None).
+    verify(email, password, stored_hash) does the expensive check and
+    returns the hash stored afterwards, or None on failure.
+
+    Credentials recently verified against the same stored hash return True
+    without calling verify. lookup runs before the rate limiters only for
+    emails with a live cache entry, so throttled attempts don't reach the
+    database. Otherwise the attempt needs a token from the email's bucket and,
+    when client_id is given, from the email-per-client and client buckets,
+    then one of MAX_CONCURRENT_CHECKS slots. LoginThrottled is raised when
+    any of these runs out.
+    """
+    stored_hash = None
+    if sessions.has(email):
+        stored_hash = lookup(email)
+        if stored_hash is not None and sessions.check(email, password, stored_hash):
+            return True
+
+    keys = [f"email:{email}"]
+    if client_id:
+        keys = [f"email:{email}|client:{client_id}", f"client:{client_id}"]
+    if not limiter.allow(*keys) or not account_limiter.allow(f"email:{email}"):
+        raise LoginThrottled("Too many login attempts. Please wait a minute and try again.")
+
+    if not check_slots.acquire(timeout=CHECK_WAIT_SECONDS):
+        raise LoginThrottled("The server is busy. Please try again in a moment.")
+    try:
+        if stored_hash is None:
+            stored_hash = lookup(email)
+        stored_hash = verify(email, password, stored_hash)
+    finally:
+        check_slots.release()
+
+    if stored_hash is None:
+        return False
+
+    sessions.add(email, password, stored_hash)
+    return True
@@ -0,0 +1,91 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Largest number of requests run together in one batch...
+MAX_BATCH = int(os.getenv("QUIZ_MAX_BATCH", "8"))
+# ...and how long the first request waits for others to join it
+MAX_WAIT = float(os.getenv("QUIZ_MAX_WAIT_MS", "10")) / 1000
+
+class MicroBatcher:
+    """Coalesce concurrent requests into batches for a list-in, list-out function.
+
+    run_batch(items) is called on a daemon worker thread with up to
+    max_batch items and must return one result per item, in order. A batch
+    is run as soon as it is full or max_wait seconds after its first item
+    arrived. If run_batch raises, every caller in that batch gets the error.
+    """
+
+    def __init__(self, run_batch, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._stats = {"requests": 0, "batches": 0, "largest_batch": 0, "errors": 0}
+
+    def submit(self, item):
+        """Queue an item and return a Future for its result"""
+        future = Future()
+        with self._lock:
+            self._stats["requests"] += 1
+            self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item):
+        """Queue an item and block until its batch has run"""
+        return self.submit(item).result()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = self.run_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            print(f"Error running batch of {len(items)}: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        finally:
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["largest_batch"] = max(self._stats["largest_batch"], len(items))
+            for _ in batch:
+                self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            result = dict(self._stats)
+        result["backlog"] = self._queue.qsize()
+        return result
@@ -0,0 +1,104 @@
+import mmap
+import threading
+import time
+
+from singleflight import SingleFlight
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PAGE_SIZE = resource.getpagesize() if resource else mmap.PAGESIZE
+
+def resident_bytes():
+    """Current resident set size of this process, or None if unknown"""
+    # /proc only exists on Linux; elsewhere memory use isn't reported
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+def parameter_bytes(obj):
+    """Bytes held by a model's parameters and buffers (0 if not a torch model)"""
+    if isinstance(obj, (tuple, list)):
+        return sum(parameter_bytes(item) for item in obj)
+    # Pipelines wrap the model rather than being one
+    if not callable(getattr(obj, "parameters", None)) and hasattr(obj, "model"):
+        obj = obj.model
+    if not callable(getattr(obj, "parameters", None)):
+        return 0
+    tensors = list(obj.parameters())
+    if callable(getattr(obj, "buffers", None)):
+        tensors += list(obj.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+class ModelRegistry:
+    """Process-wide cache of loaded models, keyed by model name and config.
+
+    get() calls loader(name, **config) the first time a key is requested
+    and returns the same object afterwards. Concurrent first requests share
+    one load, and failed loads aren't cached. Streamlit reruns scripts but
+    keeps imported modules, so a module-level registry is shared by every
+    session in the server process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+        self._info = {}
+        self._flight = SingleFlight()
+
+    @staticmethod
+    def key(name, config):
+        return (name, tuple(sorted(config.items())))
+
+    def get(self, name, loader, **config):
+        key = self.key(name, config)
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+        return self._flight.do(key, self._load, key, name, loader, config)
+
+    def _load(self, key, name, loader, config):
+        # Another caller may have finished loading just before this flight
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+
+        rss_before = resident_bytes()
+        start = time.perf_counter()
+        model = loader(name, **config)
+        seconds = time.perf_counter() - start
+        rss_after = resident_bytes()
+
+        info = {
+            "name": name,
+            "config": dict(config),
+            "load_seconds": seconds,
+            "parameter_bytes": parameter_bytes(model),
+            "rss_delta_bytes": None if rss_before is None or rss_after is None else rss_after - rss_before,
+        }
+        print(f"Loaded {name} in {seconds:.2f}s "
+              f"({info['parameter_bytes'] / 2**20:.0f} MB of weights)")
+
+        with self._lock:
+            self._models[key] = model
+            self._info[key] = info
+        return model
+
+    def unload(self, name=None):
+        """Drop every cached model, or just those loaded under name"""
+        with self._lock:
+            for key in [key for key in self._models if name is None or key[0] == name]:
+                del self._models[key]
+                del self._info[key]
+
+    def stats(self):
+        """Load time and memory footprint of every loaded model"""
+        with self._lock:
+            return [dict(info) for info in self._info.values()]
+
+# Shared by quiz.py and quiz_generator.init_model
+registry = ModelRegistry()
@@ -0,0 +1,91 @@
+import threading
+import time
+
+# NLTK data packages needed by the quiz generator, keyed by download name
+REQUIRED_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger',
+    'stopwords': 'corpora/stopwords',
+}
+
+_lock = threading.Lock()
+_resources = {}
+_load_time = None
+
+def ensure_resources():
+    """Download any missing NLTK data packages"""
+    import nltk
+
+    for name, path in REQUIRED_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            print(f"Downloading NLTK resource: {name}")
+            nltk.download(name, quiet=True)
+
+def load_resources():
+    """Load the tokenizer, tagger and stopwords, downloading data if needed"""
+    import nltk
+    from nltk.tokenize import NLTKWordTokenizer
+    from nltk.tag.perceptron import PerceptronTagger
+    from nltk.corpus import stopwords
+
+    ensure_resources()
+
+    return {
+        'sentence_tokenizer': nltk.data.load('tokenizers/punkt/english.pickle'),
+        'word_tokenizer': NLTKWordTokenizer(),
+        'tagger': PerceptronTagger(),
+        'stopwords': frozenset(stopwords.words('english')),
+    }
+
+def warm_up():
+    """Load the tokenizer, tagger and stopwords once per process.
+
+    Safe to call on every Streamlit rerun: only the first successful call
+    does any work, and a failed one (e.g. NLTK data can't be downloaded)
+    raises and leaves the next call to try again. Returns the time in
+    seconds the initial load took.
+    """
+    global _load_time
+
+    with _lock:
+        if _load_time is not None:
+            return _load_time
+
+        start = time.perf_counter()
+        _resources.update(load_resources())
+
+        _load_time = time.perf_counter() - start
+        print(f"NLP resources loaded in {_load_time:.2f}s")
+        return _load_time
+
+def _get(name):
+    """Return a loaded resource, warming up on first use"""
+    if _load_time is None:
+        warm_up()
+    return _resources[name]
+
+def load_stats():
+    """Report whether resources are loaded and how long loading took"""
+    return {
+        'loaded': _load_time is not None,
+        'load_time': _load_time,
+        'resources': sorted(_resources),
+    }
+
+def sent_tokenize(text):
+    """Split text into sentences with the cached Punkt tokenizer"""
+    return _get('sentence_tokenizer').tokenize(text)
+
+def word_tokenize(sentence):
+    """Split a single sentence into word tokens"""
+    return _get('word_tokenizer').tokenize(sentence)
+
+def pos_tag_sents(token_lists):
+    """POS-tag a batch of token lists with the cached perceptron tagger"""
+    return _get('tagger').tag_sents(token_lists)
+
+def get_stopwords():
+    """English stopwords as a frozenset"""
+    return _get('stopwords')
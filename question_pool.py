@@ -0,0 +1,106 @@
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+
+# Target number of cached questions per popular topic/difficulty
+POOL_SIZE = 50
+# Top up a popular pool once it holds fewer questions than this
+LOW_WATERMARK = 20
+# Requests seen for a key before it counts as popular
+HOT_AFTER = 3
+# How long to leave a key alone after a top-up added nothing new
+EXHAUSTED_BACKOFF_SECONDS = 60 * 60
+# Number of keys whose request counts and backoffs are remembered
+MAX_TRACKED_KEYS = 10000
+
+class QuestionPool:
+    """Keep question pools for popular topics topped up in the background.
+
+    refill(subject, topic, difficulty, target) is called on a daemon worker
+    thread. It should grow the stored pool toward target questions and
+    return how many it added. Request handling only counts the request
+    and queues a top-up; it never waits on generation.
+    """
+
+    def __init__(self, refill, pool_size=POOL_SIZE, low_watermark=LOW_WATERMARK, hot_after=HOT_AFTER):
+        self.refill = refill
+        self.pool_size = pool_size
+        self.low_watermark = low_watermark
+        self.hot_after = hot_after
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._requests = OrderedDict()
+        self._backoff = OrderedDict()
+        self._worker = None
+        self._stats = {"scheduled": 0, "refills": 0, "added": 0, "errors": 0}
+
+    def record_request(self, key, subject, topic, difficulty, available):
+        """Count a request and queue a top-up if the key is hot and running low"""
+        with self._lock:
+            count = self._requests.pop(key, 0) + 1
+            self._requests[key] = count
+            if len(self._requests) > MAX_TRACKED_KEYS:
+                self._requests.popitem(last=False)
+
+        if count >= self.hot_after and available < self.low_watermark:
+            return self.schedule(key, subject, topic, difficulty)
+        return False
+
+    def schedule(self, key, subject, topic, difficulty):
+        """Queue a top-up for a key unless one is pending or it is backing off"""
+        with self._lock:
+            if key in self._pending or self._backoff.get(key, 0) > time.monotonic():
+                return False
+            self._pending.add(key)
+            self._stats["scheduled"] += 1
+            self._ensure_worker()
+        self._queue.put((key, subject, topic, difficulty))
+        return True
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="question-pool", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            key, subject, topic, difficulty = self._queue.get()
+            added = 0
+            try:
+                added = self.refill(subject, topic, difficulty, self.pool_size) or 0
+            except Exception as e:
+                print(f"Error topping up question pool for {topic}: {e}")
+                with self._lock:
+                    self._stats["errors"] += 1
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                    self._stats["refills"] += 1
+                    self._stats["added"] += added
+                    if added == 0:
+                        self._backoff.pop(key, None)
+                        self._backoff[key] = time.monotonic() + EXHAUSTED_BACKOFF_SECONDS
+                        if len(self._backoff) > MAX_TRACKED_KEYS:
+                            self._backoff.popitem(last=False)
+                    else:
+                        self._backoff.pop(key, None)
+                self._queue.task_done()
+
+    def wait_idle(self):
+        """Block until every queued top-up has finished"""
+        self._queue.join()
+
+    def sample(self, questions, num_questions):
+        """Random sample of num_questions from a pool, in random order"""
+        return random.sample(questions, min(num_questions, len(questions)))
+
+    def stats(self):
+        with self._lock:
+            result = dict(self._stats)
+            result["pending"] = len(self._pending)
+            result["tracked_keys"] = len(self._requests)
+        return result
@@ -1,18 +1,41 @@
 from transformers import pipeline
 import streamlit as st
 
-# Move model loading inside functions to avoid loading at import time
+from micro_batcher import MAX_BATCH, MAX_WAIT, MicroBatcher
+from model_registry import registry
+from quiz_parser import iter_quiz_questions, parse_quiz_text
+
+GENERATOR_MODEL = "google/flan-t5-large"
+QUIZ_MODEL = "google/flan-t5-small"
+
+def load_pipeline(model_name, **config):
+    return pipeline("text2text-generation", model=model_name, **config)
+
+# Models are loaded on first use and then shared through the registry
 def get_generator():
-    return pipeline("text2text-generation", model="google/flan-t5-large", max_length=512)
+    return registry.get(GENERATOR_MODEL, load_pipeline, max_length=512)
 
-# Import PyTorch-related modules only when needed
-def generate_quiz(subject, topic, difficulty):
-    # Import inside function to delay loading until needed
-    
-    
-    generator = pipeline("text2text-generation", model="google/flan-t5-small", max_length=512)
-    
-    prompt = (
+def load_batched_pipeline(model_name, max_batch, max_wait, **config):
+    """Load a pipeline along with a MicroBatcher that feeds it prompt lists"""
+    generator = load_pipeline(model_name, **config)
+
+    def run_batch(prompts):
+        outputs = generator(prompts, batch_size=len(prompts))
+        return [output["generated_text"] for output in outputs]
+
+    return generator, MicroBatcher(run_batch, max_batch, max_wait)
+
+def get_quiz_model():
+    """The quiz pipeline and the batcher that feeds it"""
+    return registry.get(QUIZ_MODEL, load_batched_pipeline, max_length=512,
+                        max_batch=MAX_BATCH, max_wait=MAX_WAIT)
+
+def get_quiz_batcher():
+    """Batcher that generates quiz text for prompts from concurrent requests"""
+    return get_quiz_model()[1]
+
+def build_prompt(subject, topic, difficulty):
+    return (
         f"Generate 5 multiple choice questions for a quiz on the topic '{topic}' "
         f"under the subject '{subject}' with {difficulty} difficulty. "
         "Each question should have 4 options labeled A, B, C, and D, and include the correct answer.\n\n"
@@ -21,36 +44,27 @@ def generate_quiz(subject, topic, difficulty):
         "A. Option A\nB. Option B\nC. Option C\nD. Option D\nAnswer: B\n"
     )
 
-    # Generate the quiz text
-    result = generator(prompt)[0]["generated_text"]
-
-    # Parse the result into question objects
-    questions = []
-    current = {}
-    
-    lines = result.split("\n")
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if line.startswith("Q"):
-            if current and "question" in current:
-                questions.append(current)
-                current = {}
-            current["question"] = line
-            current["options"] = []
-        elif line.startswith(("A.", "B.", "C.", "D.")):
-            current.setdefault("options", []).append(line)
-        elif line.startswith("Answer:"):
-            current["answer"] = line.replace("Answer:", "").strip()
-        
-        i += 1
-
-    # Add the last question if it exists
-    if current and "question" in current:
-        questions.append(current)
-
-    return questions
+def stream_quiz(subject, topic, difficulty):
+    """Like generate_quiz, but yield each question as soon as its Answer: line is generated"""
+    from quiz_generator import stream_generate
+
+    generator, _ = get_quiz_model()
+    chunks = stream_generate(generator.tokenizer, generator.model,
+                             build_prompt(subject, topic, difficulty), max_length=512)
+    try:
+        yield from iter_quiz_questions(chunks)
+    finally:
+        chunks.close()
+
+# Import PyTorch-related modules only when needed
+def generate_quiz(subject, topic, difficulty):
+    prompt = build_prompt(subject, topic, difficulty)
+
+    # Generate the quiz text, batched with any other requests in flight
+    result = get_quiz_batcher()(prompt)
+
+    # Parse the result into validated question objects
+    return parse_quiz_text(result)
 
 def evaluate_quiz(questions, answers):
     correct = 0
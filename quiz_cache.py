@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from connection_pool import ConnectionPool
+
+# Generated questions keyed by a hash of the canonical subject/topic/difficulty
+CACHE_PATH = os.getenv("QUIZ_CACHE_DB", "quiz_cache.db")
+TTL_SECONDS = 30 * 24 * 60 * 60
+MAX_ENTRIES = 50000
+
+# Run the max-entries sweep once every this many writes
+EVICT_EVERY = 100
+
+# In-process LRU in front of the database. Writes made through this module
+# update it directly; MEMORY_TTL_SECONDS bounds how long another process's
+# rewrite of the same key can go unseen.
+MEMORY_MAX_ENTRIES = 256
+MEMORY_MAX_BYTES = 16 * 1024 * 1024
+MEMORY_TTL_SECONDS = 60
+
+_pool = ConnectionPool(["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"])
+_lock = threading.Lock()
+_initialized = set()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "memory_hits": 0, "memory_misses": 0}
+
+_memory = OrderedDict()
+_memory_bytes = 0
+
+# Memory hits not yet reflected in the accessed_at/hits columns, keyed by
+# key hash; written back in batches so disk LRU order stays accurate
+_touches = {}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS quiz_cache (
+        key_hash TEXT PRIMARY KEY,
+        canonical_key TEXT NOT NULL,
+        questions TEXT NOT NULL,
+        num_questions INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_quiz_cache_accessed_at ON quiz_cache(accessed_at);
+    CREATE INDEX IF NOT EXISTS idx_quiz_cache_created_at ON quiz_cache(created_at);
+'''
+
+def canonical_key(subject, topic, difficulty):
+    """Case- and whitespace-insensitive key that keeps the three fields apart"""
+    parts = [" ".join(str(part).casefold().split()) for part in (subject, topic, difficulty)]
+    return "\x1f".join(parts)
+
+def key_hash(subject, topic, difficulty):
+    return hashlib.sha256(canonical_key(subject, topic, difficulty).encode("utf-8")).hexdigest()
+
+def _memory_get(digest):
+    """Return questions from the in-memory LRU, or None"""
+    with _lock:
+        entry = _memory.get(digest)
+        if entry is None or time.monotonic() - entry[2] > MEMORY_TTL_SECONDS:
+            _stats["memory_misses"] += 1
+            return None
+        _memory.move_to_end(digest)
+        _stats["memory_hits"] += 1
+        _, count = _touches.get(digest, (0, 0))
+        _touches[digest] = (time.time(), count + 1)
+        return entry[0]
+
+def _memory_discard(digest):
+    global _memory_bytes
+
+    entry = _memory.pop(digest, None)
+    if entry is not None:
+        _memory_bytes -= entry[1]
+
+def _memory_put(digest, questions, size):
+    """Insert into the in-memory LRU, evicting until within both caps"""
+    global _memory_bytes
+
+    with _lock:
+        _memory_discard(digest)
+        if size > MEMORY_MAX_BYTES:
+            return
+        _memory[digest] = (questions, size, time.monotonic())
+        _memory_bytes += size
+        while len(_memory) > MEMORY_MAX_ENTRIES or _memory_bytes > MEMORY_MAX_BYTES:
+            _, (_, evicted_size, _) = _memory.popitem(last=False)
+            _memory_bytes -= evicted_size
+
+def clear_memory():
+    """Drop everything held in the in-memory LRU"""
+    global _memory_bytes
+
+    with _lock:
+        _memory.clear()
+        _memory_bytes = 0
+
+def _flush_touches(conn):
+    """Write pending memory hits back to the table (caller holds a transaction)"""
+    with _lock:
+        pending = [(accessed_at, count, digest) for digest, (accessed_at, count) in _touches.items()]
+        _touches.clear()
+    if pending:
+        conn.executemany(
+            "UPDATE quiz_cache SET accessed_at = MAX(accessed_at, ?), hits = hits + ? WHERE key_hash = ?",
+            pending,
+        )
+
+def get_connection():
+    """This thread's pooled connection to the cache database, created on first use"""
+    conn = _pool.get(CACHE_PATH)
+    with _lock:
+        if CACHE_PATH not in _initialized:
+            conn.executescript(SCHEMA)
+            _initialized.add(CACHE_PATH)
+    return conn
+
+def close_connections():
+    """Close the current thread's connections and every idle pooled one"""
+    _pool.close()
+
+def get(subject, topic, difficulty):
+    """Return the cached question list, or None if missing or expired
+    
+    The list may be shared with other callers and must not be mutated.
+    """
+    digest = key_hash(subject, topic, difficulty)
+    questions = _memory_get(digest)
+    if questions is not None:
+        return questions
+
+    conn = get_connection()
+    now = time.time()
+
+    row = conn.execute(
+        "SELECT questions, created_at FROM quiz_cache WHERE key_hash = ?", (digest,)
+    ).fetchone()
+
+    if row is None or now - row[1] > TTL_SECONDS:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    with conn:
+        conn.execute(
+            "UPDATE quiz_cache SET accessed_at = ?, hits = hits + 1 WHERE key_hash = ?",
+            (now, digest),
+        )
+    with _lock:
+        _stats["hits"] += 1
+    questions = json.loads(row[0])
+    _memory_put(digest, questions, len(row[0]))
+    return questions
+
+def put(subject, topic, difficulty, questions):
+    """Atomically insert or replace the cached questions for a key"""
+    conn = get_connection()
+    digest = key_hash(subject, topic, difficulty)
+    payload = json.dumps(questions)
+    now = time.time()
+
+    with conn:
+        _flush_touches(conn)
+        conn.execute(
+            '''
+            INSERT INTO quiz_cache
+            (key_hash, canonical_key, questions, num_questions, created_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key_hash) DO UPDATE SET
+                questions = excluded.questions,
+                num_questions = excluded.num_questions,
+                created_at = excluded.created_at,
+                accessed_at = excluded.accessed_at
+            ''',
+            (
+                digest,
+                canonical_key(subject, topic, difficulty),
+                payload,
+                len(questions),
+                now,
+                now,
+            ),
+        )
+    _memory_put(digest, questions, len(payload))
+
+    with _lock:
+        _stats["writes"] += 1
+        sweep = _stats["writes"] % EVICT_EVERY == 0
+    if sweep:
+        evict()
+
+def delete(subject, topic, difficulty):
+    """Remove one key from the cache"""
+    digest = key_hash(subject, topic, difficulty)
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM quiz_cache WHERE key_hash = ?", (digest,))
+    with _lock:
+        _memory_discard(digest)
+
+def evict(max_entries=None, ttl_seconds=None):
+    """Drop expired entries, then least recently used ones beyond max_entries"""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    ttl_seconds = TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+    conn = get_connection()
+    with conn:
+        _flush_touches(conn)
+        expired = conn.execute(
+            "DELETE FROM quiz_cache WHERE created_at < ?", (time.time() - ttl_seconds,)
+        ).rowcount
+        overflow = conn.execute(
+            '''
+            DELETE FROM quiz_cache WHERE key_hash IN (
+                SELECT key_hash FROM quiz_cache
+                ORDER BY accessed_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            ''',
+            (max_entries,),
+        ).rowcount
+    if expired or overflow:
+        clear_memory()
+    return expired + overflow
+
+def stats():
+    """Entry count, stored size and hit counters for both cache tiers"""
+    conn = get_connection()
+    entries, total_bytes, stored_hits = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(questions)), 0), COALESCE(SUM(hits), 0) FROM quiz_cache"
+    ).fetchone()
+
+    with _lock:
+        result = dict(_stats)
+        result["memory_entries"] = len(_memory)
+        result["memory_bytes"] = _memory_bytes
+    lookups = result["hits"] + result["misses"]
+    memory_lookups = result["memory_hits"] + result["memory_misses"]
+    result.update({
+        "entries": entries,
+        "bytes": total_bytes,
+        "stored_hits": stored_hits,
+        "hit_ratio": result["hits"] / lookups if lookups else 0.0,
+        "memory_hit_ratio": result["memory_hits"] / memory_lookups if memory_lookups else 0.0,
+    })
+    return result
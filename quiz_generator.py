@@ -1,87 +1,178 @@
 import os
-import json
+import re
+import threading
 import time
-import requests
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain, islice
 from dotenv import load_dotenv
 
+import article_cache
+import nlp_resources
+import quiz_cache
+from micro_batcher import MAX_BATCH, MAX_WAIT, MicroBatcher
+from model_registry import registry
+from question_pool import QuestionPool
+from quiz_parser import iter_quiz_questions, parse_quiz_text, validate_question
+from singleflight import SingleFlight
+
 # Load environment variables
 load_dotenv()
 
-def fetch_topic_content(subject, topic, attempt=0, broader=False):
-    """Fetch content about a topic from Wikipedia with multiple attempts"""
-    import requests
-    import json
-    import time
-    
-    def clean_text(text):
-        """Clean wiki text by removing special characters and extra whitespace"""
-        import re
-        # Remove citations [1], [2], etc.
-        text = re.sub(r'\[\d+\]', '', text)
-        # Remove parenthetical text (often contains less relevant info)
-        text = re.sub(r'\([^)]*\)', '', text)
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,!?;:-]', '', text)
-        # Replace multiple whitespace with single space
-        text = re.sub(r'\s+', ' ', text)
-        # Fix spacing around punctuation
-        text = re.sub(r'\s*([.,!?;:])\s*', r'\1 ', text)
-        return text.strip()
+# Query variants tried by generate_quiz_questions, in sequential order
+QUERY_VARIANTS = [
+    {"attempt": 0},
+    {"attempt": 1},
+    {"attempt": 2},
+    {"broader": True},
+]
+
+# Seq2seq model used by init_model
+MODEL_NAME = "facebook/bart-base"
+# How init_model runs it: "fp32" (PyTorch), "int8" (dynamically quantized
+# PyTorch) or "onnx" (ONNX Runtime, needs optimum[onnxruntime])
+MODEL_BACKENDS = ("fp32", "int8", "onnx")
+MODEL_BACKEND = os.getenv("QUIZ_MODEL_BACKEND", "fp32")
+
+# Let the app stream questions from the model instead of building them
+# from Wikipedia text
+MODEL_STREAMING = os.getenv("QUIZ_MODEL_STREAMING", "0") == "1"
+
+# Fetch every query variant at once instead of one after another
+CONCURRENT_FETCH = os.getenv("QUIZ_CONCURRENT_FETCH", "0") == "1"
+
+def build_search_query(subject, topic, attempt=0, broader=False):
+    """Build the Wikipedia search query for an attempt number"""
+    if broader:
+        return topic
+    elif attempt == 0:
+        return f"{topic} {subject}"
+    elif attempt == 1:
+        return f"{topic} definition {subject}"
+    else:
+        return f"{topic} introduction"
+
+# clean_text's five original steps, reduced to two regex passes with
+# precompiled patterns. The first drops citations like [1], parenthetical
+# asides and other special characters; "[" and "(" are only dropped on
+# their own once the citation and parenthetical alternatives have failed,
+# as when those steps ran first.
+STRIP_PATTERN = re.compile(r'\[\d+\]|\([^)]*\)|[^\w\s.,!?;:\-\[(]+|[\[(]')
+# The second leaves one space after punctuation, once str.split has
+# collapsed whitespace (the same characters as \s) to single spaces
+PUNCTUATION_PATTERN = re.compile(r' ?([.,!?;:]) ?')
+
+def clean_text(text):
+    """Clean wiki text by removing special characters and extra whitespace"""
+    text = " ".join(STRIP_PATTERN.sub('', text).split())
+    return PUNCTUATION_PATTERN.sub(r'\1 ', text).rstrip()
+
+# "== Heading ==" lines in plain-text extracts; more "=" is a deeper level
+SECTION_HEADING_PATTERN = re.compile(r'^[ \t]*(=+)[ \t]*(.*?)[ \t]*\1[ \t]*$', re.MULTILINE)
+# Sections (and their subsections) made of links and citations, not prose
+SKIPPED_SECTIONS = {"see also", "references", "notes", "external links", "further reading", "bibliography", "sources"}
+
+def iter_article_sections(content):
+    """Yield the cleaned text of each non-empty section of an article, in order
+    
+    Sections are split on their headings before cleaning and are cleaned
+    only as they are requested, so a consumer that stops early never
+    processes the rest of the article.
+    """
+    start = 0
+    skip_level = None
+    for match in SECTION_HEADING_PATTERN.finditer(content):
+        if skip_level is None:
+            section = clean_text(content[start:match.start()])
+            if section:
+                yield section
+        start = match.end()
+        
+        level = len(match.group(1))
+        if skip_level is None or level <= skip_level:
+            skip_level = level if match.group(2).lower() in SKIPPED_SECTIONS else None
+    
+    if skip_level is None:
+        section = clean_text(content[start:])
+        if section:
+            yield section
+
+def generic_topic_content(subject, topic):
+    """Filler text about a topic, used when Wikipedia has nothing on it"""
+    return f"{topic} is an important concept in {subject}. It involves various principles and methods that are widely used in the field. Understanding {topic} is essential for mastering {subject} and its applications in real-world scenarios."
+
+def fetch_topic_content(subject, topic, attempt=0, broader=False, fallback=True):
+    """Fetch content about a topic from Wikipedia with multiple attempts
     
+    Returns the article's whole plain-text extract, headings included, for
+    iter_article_sections to clean. When nothing usable is found, returns
+    generic filler text about the topic, or None if fallback is False.
+    """
     try:
         # Modify search query based on attempt number and broader flag
-        if broader:
-            search_query = topic
-        elif attempt == 0:
-            search_query = f"{topic} {subject}"
-        elif attempt == 1:
-            search_query = f"{topic} definition {subject}"
-        else:
-            search_query = f"{topic} introduction"
-        
-        search_url = f"https://en.wikipedia.org/w/api.php?action=query&list=search&srsearch={search_query}&format=json"
+        search_query = build_search_query(subject, topic, attempt, broader)
         
         print(f"Searching Wikipedia for: {search_query}")
-        search_response = requests.get(search_url)
-        search_data = search_response.json()
+        results = article_cache.search(search_query)
         
-        if not search_data.get('query', {}).get('search'):
+        if not results:
             print("No Wikipedia articles found")
-            return f"{topic} is an important concept in {subject}. It involves various principles and methods that are widely used in the field. Understanding {topic} is essential for mastering {subject} and its applications in real-world scenarios."
+            if not fallback:
+                return None
+            return generic_topic_content(subject, topic)
         
         # Get the page ID (use different result based on attempt number)
-        results = search_data['query']['search']
         page_id = results[min(attempt, len(results)-1)]['pageid']
         
-        # Fetch both the intro and the first few sections
-        content_url = (
-            f"https://en.wikipedia.org/w/api.php?"
-            f"action=query&prop=extracts&explaintext=1&"
-            f"pageids={page_id}&format=json"
-        )
-        
+        # Fetch the whole article; it is cleaned section by section later
         print("Fetching article content...")
-        content_response = requests.get(content_url)
-        content_data = content_response.json()
+        content = article_cache.fetch_extract(page_id)
         
-        # Extract and clean the content
-        content = content_data['query']['pages'][str(page_id)]['extract']
+        # Only clean as much as it takes to tell the article is usable
+        cleaned_length = 0
+        for section in iter_article_sections(content):
+            cleaned_length += len(section)
+            if cleaned_length >= 200:
+                break
         
-        # Take a reasonable chunk of content
-        content = content[:3000]  # Get more content for better question generation
-        cleaned_content = clean_text(content)
-        
-        if len(cleaned_content) < 200:
+        if cleaned_length < 200:
             print("Content too short after cleaning")
+            if not fallback:
+                return None
             return f"{topic} is a fundamental concept in {subject}. It encompasses various important principles and methodologies. Studying {topic} helps in understanding key aspects of {subject} and its practical applications."
         
-        return cleaned_content
+        return content
         
     except Exception as e:
         print(f"Error fetching content: {e}")
+        if not fallback:
+            return None
         return f"{topic} is a crucial element in {subject}. It plays a vital role in understanding and applying key concepts. Mastering {topic} is essential for success in {subject} and related fields."
 
+def fetch_topic_contents(subject, topic):
+    """Fetch every query variant concurrently and return the distinct articles
+    
+    Worst-case latency is one search plus one extract round trip instead of
+    one per variant. Falls back to generic filler text if no variant
+    yields usable content.
+    """
+    with ThreadPoolExecutor(max_workers=len(QUERY_VARIANTS)) as executor:
+        futures = [
+            executor.submit(fetch_topic_content, subject, topic, fallback=False, **variant)
+            for variant in QUERY_VARIANTS
+        ]
+        results = [future.result() for future in futures]
+    
+    articles = []
+    for content in results:
+        if content and content not in articles:
+            articles.append(content)
+    
+    # The broader variant already ran above, so don't search again
+    if not articles:
+        articles.append(generic_topic_content(subject, topic))
+    return articles
+
 def test_api_access():
     """Test if we can access the Hugging Face API with the provided key"""
     try:
@@ -106,35 +197,127 @@ def test_api_access():
     except ImportError:
         return False, "transformers library not installed"
 
-def init_model():
-    """Initialize the model only when needed"""
+# Sampling settings shared by batched and streamed generation
+GENERATION_KWARGS = {"num_return_sequences": 1, "temperature": 0.7, "do_sample": True, "top_p": 0.9}
+
+def generate_batch(tokenizer, model, requests):
+    """Generate text for a list of (prompt, max_length) requests
+    
+    Requests sharing a max_length run as one padded batch through
+    model.generate; results come back in request order.
+    """
+    results = [None] * len(requests)
+    groups = {}
+    for i, (prompt, max_length) in enumerate(requests):
+        groups.setdefault(max_length, []).append(i)
+    
+    for max_length, positions in groups.items():
+        inputs = tokenizer([requests[i][0] for i in positions], return_tensors="pt",
+                           max_length=512, truncation=True, padding=True)
+        outputs = model.generate(
+            inputs.input_ids,
+            attention_mask=inputs.attention_mask,
+            max_length=max_length,
+            **GENERATION_KWARGS
+        )
+        for i, text in zip(positions, tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+            results[i] = text
+    return results
+
+def stream_generate(tokenizer, model, prompt, max_length=1024):
+    """Yield decoded text chunks for one prompt while the model generates
+    
+    model.generate runs on its own thread feeding a TextIteratorStreamer.
+    Closing the generator early stops generation at the next token.
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+    
+    stop = threading.Event()
+    
+    class StopWhenClosed(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return stop.is_set()
+    
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+    inputs = tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
+    
+    def run():
+        try:
+            model.generate(
+                inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_length=max_length,
+                streamer=streamer,
+                stopping_criteria=StoppingCriteriaList([StopWhenClosed()]),
+                **GENERATION_KWARGS
+            )
+        except Exception as e:
+            print(f"Error streaming generation: {e}")
+            # Release the reader, which would otherwise wait forever
+            streamer.end()
+    
+    thread = threading.Thread(target=run, name="stream-generate", daemon=True)
+    thread.start()
     try:
-        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+        yield from streamer
+    finally:
+        stop.set()
+        thread.join()
+
+def load_seq2seq(model_name, backend="fp32", token=None):
+    """Load a tokenizer and seq2seq model for one of MODEL_BACKENDS"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}; expected one of {MODEL_BACKENDS}")
+    
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            raise ImportError("The onnx backend needs optimum: pip install optimum[onnxruntime]")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, token=token)
+        return tokenizer, model
+    
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, token=token)
+    model.eval()
+    if backend == "int8":
         import torch
-        
+        # Linear layers hold nearly all of BART's weights and compute
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+def init_model(backend=None, stream=False):
+    """Initialize the model only when needed
+    
+    Returns generate_text(prompt, max_length=1024). Calls from concurrent
+    requests are queued on a MicroBatcher and generated together. With
+    stream=True the returned callable instead yields text chunks as they
+    are generated. backend defaults to MODEL_BACKEND.
+    """
+    try:
         # Get API key from environment
         api_key = os.getenv("HUGGINGFACE_API_KEY")
         if not api_key:
             raise ValueError("HUGGINGFACE_API_KEY not found in environment variables")
         
-        # Use BART model which is more stable for text generation
-        model_name = "facebook/bart-base"
-        print(f"Loading {model_name}...")
+        def load(model_name, backend, max_batch, max_wait):
+            print(f"Loading {model_name} ({backend})...")
+            tokenizer, model = load_seq2seq(model_name, backend, token=api_key)
+            batcher = MicroBatcher(partial(generate_batch, tokenizer, model), max_batch, max_wait)
+            return tokenizer, model, batcher
+        
+        # Use BART model which is more stable for text generation; it is
+        # loaded once per process and shared by every later init_model call
+        tokenizer, model, batcher = registry.get(MODEL_NAME, load, backend=backend or MODEL_BACKEND,
+                                                 max_batch=MAX_BATCH, max_wait=MAX_WAIT)
         
-        tokenizer = AutoTokenizer.from_pretrained(model_name, token=api_key)
-        model = AutoModelForSeq2SeqLM.from_pretrained(model_name, token=api_key)
+        if stream:
+            return partial(stream_generate, tokenizer, model)
         
         def generate_text(prompt, max_length=1024):
-            inputs = tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
-            outputs = model.generate(
-                inputs.input_ids,
-                max_length=max_length,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True,
-                top_p=0.9
-            )
-            return tokenizer.decode(outputs[0], skip_special_tokens=True)
+            return batcher((prompt, max_length))
         
         return generate_text
         
@@ -142,82 +325,122 @@ def init_model():
         print(f"Error initializing model: {str(e)}")
         return None
 
-def validate_question(question):
-    """Validate that a question meets our quality criteria"""
-    if not question.get("question") or not question.get("options"):
-        return False
-        
-    # Check if we have exactly 4 options
-    if len(question.get("options", [])) != 4:
-        return False
-        
-    # Check if we have an answer and it's valid
-    answer = question.get("answer", "").upper().strip()
-    if not answer or answer not in ["A", "B", "C", "D"]:
-        return False
-        
-    # Check if the question text is reasonable length
-    if len(question["question"]) < 10:
-        return False
-        
-    return True
-
-def parse_quiz_text(text):
-    """Parse the generated text into quiz questions with improved validation"""
-    questions = []
-    current = {}
-    
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    
-    for line in lines:
-        if line.startswith(("Q", "Question")):
-            if current and validate_question(current):
-                questions.append(current)
-            current = {"question": line.split(".", 1)[-1].strip(), "options": []}
-        elif line.startswith(("A.", "B.", "C.", "D.")):
-            option = line.split(".", 1)
-            if len(option) == 2:
-                current.setdefault("options", []).append(line)
-        elif "Answer:" in line.upper():
-            answer = line.upper().replace("ANSWER:", "").strip()
-            if answer in ["A", "B", "C", "D"]:
-                current["answer"] = answer
-    
-    # Add the last question if it exists and is valid
-    if current and validate_question(current):
-        questions.append(current)
-    
-    return questions
-
-def generate_template_questions(content, subject, topic, difficulty, num_questions):
-    """Generate questions using templates and NLP processing"""
-    import nltk
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    from nltk.tag import pos_tag
-    from nltk.corpus import stopwords
-    import random
-    import re
+def build_model_prompt(subject, topic, difficulty, num_questions):
+    """Prompt asking the model for questions in the format parse_quiz_text reads"""
+    return (
+        f"Generate {num_questions} multiple choice questions for a quiz on the topic '{topic}' "
+        f"under the subject '{subject}' with {difficulty} difficulty. "
+        "Each question should have 4 options labeled A, B, C, and D, and include the correct answer.\n\n"
+        "Format:\n"
+        "Q1. Question text?\n"
+        "A. Option A\nB. Option B\nC. Option C\nD. Option D\nAnswer: B\n"
+    )
+
+def stream_model_questions(subject, topic, difficulty, num_questions=5, backend=None):
+    """Yield model-generated questions one at a time as they are decoded
+    
+    Stops generating once num_questions valid questions have been yielded.
+    Yields nothing if the model can't be loaded.
+    """
+    stream_text = init_model(backend, stream=True)
+    if stream_text is None:
+        return
     
+    chunks = stream_text(build_model_prompt(subject, topic, difficulty, num_questions))
     try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-        nltk.download('averaged_perceptron_tagger')
-        nltk.download('stopwords')
+        for count, question in enumerate(iter_quiz_questions(chunks), 1):
+            yield question
+            if count >= num_questions:
+                break
+    finally:
+        chunks.close()
+
+def extract_key_phrases(tagged):
+    """Extract important phrases from a POS-tagged sentence"""
+    # Extract noun phrases and important words
+    phrases = []
+    current_phrase = []
+    
+    for word, tag in tagged:
+        if tag.startswith(('NN', 'JJ', 'VB')):  # Nouns, adjectives, verbs
+            current_phrase.append(word)
+        elif current_phrase:
+            phrases.append(' '.join(current_phrase))
+            current_phrase = []
+    
+    if current_phrase:
+        phrases.append(' '.join(current_phrase))
     
-    # Clean and prepare content
-    sentences = sent_tokenize(content)
+    return [p for p in phrases if len(p.split()) <= 3 and len(p) >= 4]
+
+def tag_sentences(sentences):
+    """POS-tag all sentences in a single batched tagger call"""
+    return nlp_resources.pos_tag_sents(
+        [nlp_resources.word_tokenize(sentence) for sentence in sentences]
+    )
+
+def build_phrase_index(sentences):
+    """Tag every sentence once and index its key phrases.
+    
+    Returns a list of entries (one per sentence, in order) holding the
+    sentence and its key phrases, so question construction and distractor
+    selection never re-tag a sentence.
+    """
+    index = []
+    for sentence, tagged in zip(sentences, tag_sentences(sentences)):
+        index.append({
+            'sentence': sentence,
+            'phrases': extract_key_phrases(tagged)
+        })
+    return index
+
+def other_key_phrases(index, position):
+    """Key phrases from every indexed sentence except the one at position"""
+    sentence = index[position]['sentence']
+    return [
+        phrase
+        for entry in index
+        if entry['sentence'] != sentence
+        for phrase in entry['phrases']
+    ]
+
+def section_sentences(section):
+    """Sentences from a cleaned section that are worth asking about"""
+    sentences = nlp_resources.sent_tokenize(section)
     
     # Filter out very short or very long sentences
     sentences = [s for s in sentences if 20 <= len(s) <= 200]
     
     # Remove sentences with unwanted patterns
-    sentences = [s for s in sentences if not any(pattern in s.lower() for pattern in [
+    return [s for s in sentences if not any(pattern in s.lower() for pattern in [
         "click", "copyright", "cookies", "website", "http", "https"
     ])]
+
+def generate_template_questions(content, subject, topic, difficulty, num_questions, used_sentences=()):
+    """Generate up to num_questions questions from an article's text
+    
+    content is one article or a list of articles. Each article is split
+    into sections on its own, so a skipped section at the end of one
+    article can't swallow the start of the next. Sentences in
+    used_sentences aren't asked about again.
+    """
+    articles = [content] if isinstance(content, str) else content
+    sections = chain.from_iterable(iter_article_sections(article) for article in articles)
+    questions = iter_template_questions(sections, subject, topic, difficulty, used_sentences)
+    return list(islice(questions, num_questions))
+
+def iter_template_questions(sections, subject, topic, difficulty, used_sentences=()):
+    """Lazily generate questions using templates and NLP processing
+    
+    Each cleaned section is tokenized and tagged only when the questions
+    from earlier sections have been consumed. Distractors come from the
+    phrases of every section read so far. Sentences in used_sentences
+    (e.g. the answers already in a cached pool) are skipped.
+    """
+    import random
     
-    questions = []
-    used_sentences = set()
+    phrase_index = []
+    used_sentences = set(used_sentences)
     
     # Question templates based on difficulty
     templates = {
@@ -259,27 +482,6 @@ def generate_template_questions(content, subject, topic, difficulty, num_questio
         ]
     }
     
-    def extract_key_phrases(sentence):
-        """Extract important phrases from a sentence"""
-        words = word_tokenize(sentence)
-        tagged = pos_tag(words)
-        
-        # Extract noun phrases and important words
-        phrases = []
-        current_phrase = []
-        
-        for word, tag in tagged:
-            if tag.startswith(('NN', 'JJ', 'VB')):  # Nouns, adjectives, verbs
-                current_phrase.append(word)
-            elif current_phrase:
-                phrases.append(' '.join(current_phrase))
-                current_phrase = []
-        
-        if current_phrase:
-            phrases.append(' '.join(current_phrase))
-        
-        return [p for p in phrases if len(p.split()) <= 3 and len(p) >= 4]
-    
     def generate_distractors(correct_answer, key_phrases, num_distractors=3):
         """Generate plausible but incorrect options"""
         distractors = []
@@ -301,90 +503,88 @@ def generate_template_questions(content, subject, topic, difficulty, num_questio
             
         return list(set(distractors))[:num_distractors]
     
-    for sentence in sentences:
-        if len(questions) >= num_questions:
-            break
+    for section in sections:
+        # Tag each section's sentences once, as the section is reached
+        start = len(phrase_index)
+        phrase_index.extend(build_phrase_index(section_sentences(section)))
+        
+        for position in range(start, len(phrase_index)):
+            entry = phrase_index[position]
+            sentence = entry['sentence']
             
-        # Skip if we've used this sentence
-        if sentence in used_sentences:
-            continue
-        
-        # Extract key information
-        key_phrases = extract_key_phrases(sentence)
-        if not key_phrases:
-            continue
-        
-        # Select template based on difficulty
-        available_templates = templates.get(difficulty.lower(), templates["intermediate"])
-        template = random.choice(available_templates)
-        
-        try:
-            # Generate question and answer
-            key_term = random.choice(key_phrases)
+            # Skip if we've used this sentence
+            if sentence in used_sentences:
+                continue
             
-            if template["type"] == "definition":
-                question = template["pattern"].format(key_term)
-                correct_answer = sentence
-            elif template["type"] == "description":
-                question = template["pattern"].format(key_term)
-                correct_answer = sentence
-            elif template["type"] == "relationship":
-                question = template["pattern"].format(key_term, topic)
-                correct_answer = sentence
-            elif template["type"] == "purpose":
-                question = template["pattern"].format(key_term, subject)
-                correct_answer = sentence
-            elif template["type"] == "analysis":
-                question = template["pattern"].format(key_term, topic)
-                correct_answer = sentence
-            else:
-                question = template["pattern"].format(key_term, topic)
-                correct_answer = sentence
+            # Extract key information
+            key_phrases = entry['phrases']
+            if not key_phrases:
+                continue
             
-            # Generate distractors
-            other_key_phrases = []
-            for s in sentences:
-                if s != sentence:
-                    other_key_phrases.extend(extract_key_phrases(s))
+            # Select template based on difficulty
+            available_templates = templates.get(difficulty.lower(), templates["intermediate"])
+            template = random.choice(available_templates)
             
-            distractors = generate_distractors(correct_answer, other_key_phrases)
+            try:
+                # Generate question and answer
+                key_term = random.choice(key_phrases)
             
-            # Ensure we have enough distractors
-            while len(distractors) < 3:
-                distractors.append(f"None of the above statements about {key_term} are correct")
+                if template["type"] == "definition":
+                    question = template["pattern"].format(key_term)
+                    correct_answer = sentence
+                elif template["type"] == "description":
+                    question = template["pattern"].format(key_term)
+                    correct_answer = sentence
+                elif template["type"] == "relationship":
+                    question = template["pattern"].format(key_term, topic)
+                    correct_answer = sentence
+                elif template["type"] == "purpose":
+                    question = template["pattern"].format(key_term, subject)
+                    correct_answer = sentence
+                elif template["type"] == "analysis":
+                    question = template["pattern"].format(key_term, topic)
+                    correct_answer = sentence
+                else:
+                    question = template["pattern"].format(key_term, topic)
+                    correct_answer = sentence
             
-            # Create options dictionary with correct answer randomly placed
-            options = distractors[:3]
-            correct_option = random.choice(['A', 'B', 'C', 'D'])
-            options_dict = {}
+                # Generate distractors from the other sentences' indexed phrases
+                distractors = generate_distractors(correct_answer, other_key_phrases(phrase_index, position))
             
-            option_index = 0
-            for letter in ['A', 'B', 'C', 'D']:
-                if letter == correct_option:
-                    options_dict[letter] = correct_answer
-                else:
-                    if option_index < len(options):
-                        options_dict[letter] = options[option_index]
-                        option_index += 1
+                # Ensure we have enough distractors
+                while len(distractors) < 3:
+                    distractors.append(f"None of the above statements about {key_term} are correct")
+            
+                # Create options dictionary with correct answer randomly placed
+                options = distractors[:3]
+                correct_option = random.choice(['A', 'B', 'C', 'D'])
+                options_dict = {}
+            
+                option_index = 0
+                for letter in ['A', 'B', 'C', 'D']:
+                    if letter == correct_option:
+                        options_dict[letter] = correct_answer
                     else:
-                        options_dict[letter] = f"Alternative explanation of {key_term}"
+                        if option_index < len(options):
+                            options_dict[letter] = options[option_index]
+                            option_index += 1
+                        else:
+                            options_dict[letter] = f"Alternative explanation of {key_term}"
             
-            # Create question dictionary
-            question_dict = {
-                'question': question,
-                'options': options_dict,
-                'answer': correct_option,
-                'explanation': f"The correct answer is {correct_option}. {correct_answer}"
-            }
+                # Create question dictionary
+                question_dict = {
+                    'question': question,
+                    'options': options_dict,
+                    'answer': correct_option,
+                    'explanation': f"The correct answer is {correct_option}. {correct_answer}"
+                }
             
-            questions.append(question_dict)
-            used_sentences.add(sentence)
+                used_sentences.add(sentence)
+                yield question_dict
             
-        except Exception as e:
-            print(f"Error generating question: {e}")
-            continue
-    
-    return questions
+            except Exception as e:
+                print(f"Error generating question: {e}")
+                continue
 
 def generate_generic_questions(subject, topic, difficulty, num_questions):
     """Generate generic questions when specific content is not available"""
@@ -446,28 +646,15 @@ def generate_generic_questions(subject, topic, difficulty, num_questions):
     shuffle(templates)
     return templates[:num_questions]
 
-def generate_quiz_questions(subject, topic, difficulty, num_questions=5):
-    """Generate quiz questions using template-based approach"""
-    print(f"Generating quiz about {topic} in {subject} at {difficulty} level...")
-    
-    cache_dir = Path("quiz_cache")
-    cache_dir.mkdir(exist_ok=True)
-    
-    cache_key = f"{subject}_{topic}_{difficulty}".lower().replace(" ", "_")
-    cache_file = cache_dir / f"{cache_key}.json"
-    
-    # Try to load from cache first
-    if cache_file.exists():
-        try:
-            print("Checking cache...")
-            with open(cache_file, "r") as f:
-                questions = json.load(f)
-                if len(questions) >= num_questions:
-                    print(f"Found {len(questions)} cached questions")
-                    return questions[:num_questions]
-        except Exception as e:
-            print(f"Cache error: {e}")
-    
+def add_unique_questions(all_questions, new_questions):
+    """Append questions whose text isn't already in all_questions"""
+    for q in new_questions:
+        # Check if this question is unique (not already in all_questions)
+        if not any(existing_q['question'] == q['question'] for existing_q in all_questions):
+            all_questions.append(q)
+
+def generate_sequential_questions(subject, topic, difficulty, num_questions):
+    """Try query variants one after another until enough questions exist"""
     # Keep trying until we get enough questions
     all_questions = []
     attempts = 0
@@ -484,10 +671,7 @@ def generate_quiz_questions(subject, topic, difficulty, num_questions=5):
         new_questions = generate_template_questions(content, subject, topic, difficulty, num_questions)
         
         # Add new unique questions
-        for q in new_questions:
-            # Check if this question is unique (not already in all_questions)
-            if not any(existing_q['question'] == q['question'] for existing_q in all_questions):
-                all_questions.append(q)
+        add_unique_questions(all_questions, new_questions)
         
         print(f"Total unique questions so far: {len(all_questions)}/{num_questions}")
         attempts += 1
@@ -497,9 +681,53 @@ def generate_quiz_questions(subject, topic, difficulty, num_questions=5):
             print("\nTrying with broader topic scope...")
             content = fetch_topic_content(subject, topic, broader=True)
             new_questions = generate_template_questions(content, subject, topic, difficulty, num_questions)
-            for q in new_questions:
-                if not any(existing_q['question'] == q['question'] for existing_q in all_questions):
-                    all_questions.append(q)
+            add_unique_questions(all_questions, new_questions)
+    
+    return all_questions
+
+def generate_concurrent_questions(subject, topic, difficulty, num_questions):
+    """Fetch all query variants at once and generate from their union"""
+    print("\nFetching all query variants concurrently...")
+    articles = fetch_topic_contents(subject, topic)
+    print(f"Retrieved {sum(len(article) for article in articles)} characters of content")
+    
+    print("Generating questions...")
+    all_questions = []
+    add_unique_questions(all_questions, generate_template_questions(articles, subject, topic, difficulty, num_questions))
+    
+    print(f"Total unique questions: {len(all_questions)}/{num_questions}")
+    return all_questions
+
+# Requests for a topic that arrive while one is generating share its result
+generation_flight = SingleFlight()
+
+# Largest question count asked for per topic since its last generation started
+_requested_counts = {}
+_requested_lock = threading.Lock()
+
+def load_cached_questions(subject, topic, difficulty):
+    """Return the cached question pool for a topic, or an empty list"""
+    try:
+        print("Checking cache...")
+        questions = quiz_cache.get(subject, topic, difficulty)
+        if questions:
+            print(f"Found {len(questions)} cached questions")
+            return questions
+    except Exception as e:
+        print(f"Cache error: {e}")
+    return []
+
+def generate_and_cache_questions(subject, topic, difficulty, num_questions, concurrent):
+    """Run the fetch/tag/template pipeline and store the result in the cache"""
+    # A generation that finished just before this one started may have filled the cache
+    questions = load_cached_questions(subject, topic, difficulty)
+    if len(questions) >= num_questions:
+        return questions
+    
+    if concurrent:
+        all_questions = generate_concurrent_questions(subject, topic, difficulty, num_questions)
+    else:
+        all_questions = generate_sequential_questions(subject, topic, difficulty, num_questions)
     
     # If we still don't have enough questions, generate some generic ones
     if len(all_questions) < num_questions:
@@ -511,13 +739,77 @@ def generate_quiz_questions(subject, topic, difficulty, num_questions=5):
     if all_questions:
         try:
             print("\nSaving questions to cache...")
-            with open(cache_file, "w") as f:
-                json.dump(all_questions, f)
+            quiz_cache.put(subject, topic, difficulty, all_questions)
             print("Questions saved successfully")
         except Exception as e:
             print(f"Error saving to cache: {e}")
     
-    return all_questions[:num_questions]
+    return all_questions
+
+def generate_requested_questions(key, subject, topic, difficulty, concurrent):
+    """Generate enough questions for every caller waiting on this topic"""
+    with _requested_lock:
+        num_questions = _requested_counts.pop(key, 0)
+    return generate_and_cache_questions(subject, topic, difficulty, num_questions, concurrent)
+
+def top_up_question_pool(subject, topic, difficulty, target):
+    """Generate fresh questions and merge them into the cached pool
+    
+    Runs on the question pool's background worker. Returns how many new
+    questions were added.
+    """
+    pool = list(load_cached_questions(subject, topic, difficulty))
+    if len(pool) >= target:
+        return 0
+    
+    print(f"\nTopping up question pool for {topic} ({len(pool)}/{target})...")
+    articles = fetch_topic_contents(subject, topic)
+    # Template answers are source sentences; don't re-template ones the pool already asks about
+    answered = {question['options'].get(question['answer']) for question in pool}
+    new_questions = generate_template_questions(articles, subject, topic, difficulty, target - len(pool), answered)
+    
+    before = len(pool)
+    add_unique_questions(pool, new_questions)
+    added = len(pool) - before
+    if added:
+        quiz_cache.put(subject, topic, difficulty, pool[:target])
+    return added
+
+# Popular topics keep a pool of cached questions topped up in the background
+question_pool = QuestionPool(top_up_question_pool)
+
+def generate_quiz_questions(subject, topic, difficulty, num_questions=5, concurrent=None):
+    """Generate quiz questions using template-based approach
+    
+    Returns a random sample from the topic's cached pool when it has enough
+    questions. With concurrent=True every query variant is fetched in
+    parallel; None uses the QUIZ_CONCURRENT_FETCH setting.
+    """
+    print(f"Generating quiz about {topic} in {subject} at {difficulty} level...")
+    
+    # Try to load from cache first
+    key = quiz_cache.key_hash(subject, topic, difficulty)
+    questions = load_cached_questions(subject, topic, difficulty)
+    
+    if len(questions) < num_questions:
+        if concurrent is None:
+            concurrent = CONCURRENT_FETCH
+        
+        # Callers share one generation sized for the largest request; one
+        # that joined a smaller generation after it started runs again
+        for _ in range(2):
+            with _requested_lock:
+                _requested_counts[key] = max(_requested_counts.get(key, 0), num_questions)
+            questions = generation_flight.do(
+                key, generate_requested_questions,
+                key, subject, topic, difficulty, concurrent
+            )
+            if len(questions) >= num_questions:
+                break
+    
+    # Popular topics get their pool refilled without blocking this request
+    question_pool.record_request(key, subject, topic, difficulty, len(questions))
+    return question_pool.sample(questions, num_questions)
 
 def evaluate_quiz(questions, answers):
     """Evaluate the quiz answers and return the score"""
@@ -0,0 +1,92 @@
+OPTION_LETTERS = ("A", "B", "C", "D")
+OPTION_PREFIXES = tuple(f"{letter}." for letter in OPTION_LETTERS)
+
+def validate_question(question):
+    """Validate that a question meets our quality criteria"""
+    if not question.get("question") or not question.get("options"):
+        return False
+
+    # Check if we have exactly 4 options
+    if len(question.get("options", [])) != 4:
+        return False
+
+    # Check if we have an answer and it's valid
+    answer = question.get("answer", "").upper().strip()
+    if not answer or answer not in OPTION_LETTERS:
+        return False
+
+    # Check if the question text is reasonable length
+    if len(question["question"]) < 10:
+        return False
+
+    return True
+
+class QuizParser:
+    """Incremental parser for model-generated quiz text.
+
+    Text is fed in arbitrary chunks and only complete lines are parsed. The
+    parser is either between questions or inside one: a "Q..." line opens a
+    question, "A."-"D." lines fill in its options and the Answer: line
+    closes it, at which point it is validated and emitted with options as
+    {"A": text, ...}. Lines outside a question are ignored, as is a
+    question that never gets an answer.
+    """
+
+    def __init__(self):
+        self._partial = []
+        self._current = None
+
+    def feed(self, chunk):
+        """Consume a chunk of text; return the questions it completed"""
+        if "\n" not in chunk:
+            # Hold on to pieces rather than growing one string per chunk
+            self._partial.append(chunk)
+            return []
+
+        self._partial.append(chunk)
+        lines = "".join(self._partial).split("\n")
+        self._partial = [lines.pop()]
+
+        completed = []
+        for line in lines:
+            question = self._line(line)
+            if question is not None:
+                completed.append(question)
+        return completed
+
+    def close(self):
+        """Parse whatever is left after the last newline"""
+        question = self._line("".join(self._partial))
+        self._partial = []
+        self._current = None
+        return [question] if question is not None else []
+
+    def _line(self, line):
+        line = line.strip()
+        if not line:
+            return None
+
+        if line.startswith("Q"):
+            self._current = {"question": line.split(".", 1)[-1].strip(), "options": {}}
+        elif self._current is None:
+            pass
+        elif line.startswith(OPTION_PREFIXES):
+            self._current["options"][line[0]] = line[2:].strip()
+        elif "ANSWER:" in line.upper():
+            question, self._current = self._current, None
+            question["answer"] = line.upper().split("ANSWER:", 1)[1].strip()
+            if validate_question(question):
+                return question
+        return None
+
+def parse_quiz_text(text):
+    """Parse complete quiz text into validated questions"""
+    parser = QuizParser()
+    return parser.feed(text) + parser.close()
+
+def iter_quiz_questions(chunks):
+    """Yield validated questions from streamed quiz text as each one completes"""
+    parser = QuizParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -1,28 +1,77 @@
-import sqlite3
-import bcrypt
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def reset_passwords():
-    conn = sqlite3.connect('users.db')
+import database
+
+DEFAULT_PASSWORD = "password123"
+# Users hashed per worker task and per UPDATE transaction
+CHUNK_SIZE = 64
+
+def hash_chunk(chunk, rounds):
+    """Hash (email, password) pairs; runs in a worker process"""
+    return [(database.hash_password(password, rounds), email) for email, password in chunk]
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def reset_passwords(password=DEFAULT_PASSWORD, hash_existing=False, rounds=None,
+                    workers=None, chunk_size=CHUNK_SIZE):
+    """Bulk reset (or hash in place) every user's password across CPU cores
+    
+    By default every user gets password. With hash_existing, users' current
+    plaintext passwords are hashed in place instead; existing bcrypt hashes
+    are left for login_user to upgrade. Hashing runs on a process pool and
+    each finished chunk is written with one executemany UPDATE.
+    """
+    rounds = rounds or database.BCRYPT_ROUNDS
+    database.init_db()
+    conn = database.get_connection()
     c = conn.cursor()
     
     # Get all users
-    c.execute('SELECT email FROM users')
+    c.execute('SELECT email, password FROM users')
     users = c.fetchall()
     
-    for user in users:
-        email = user[0]
-        # Set a default password (you can change this)
-        default_password = "password123"
-        hashed_pw = bcrypt.hashpw(default_password.encode(), bcrypt.gensalt())
-        hashed_pw_str = hashed_pw.decode('utf-8')
-        
-        # Update the password
-        c.execute('UPDATE users SET password = ? WHERE email = ?', (hashed_pw_str, email))
-        print(f"Reset password for user: {email}")
+    if hash_existing:
+        pending = [(email, stored) for email, stored in users
+                   if not database.is_bcrypt_hash(stored)]
+        skipped = len(users) - len(pending)
+        if skipped:
+            print(f"Skipping {skipped} users that already have bcrypt hashes")
+    else:
+        pending = [(email, password) for email, _ in users]
+    
+    total = len(pending)
+    done = 0
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(hash_chunk, chunk, rounds) for chunk in chunked(pending, chunk_size)]
+        for future in futures:
+            updates = future.result()
+            
+            # Update the passwords
+            c.executemany('UPDATE users SET password = ? WHERE email = ?', updates)
+            conn.commit()
+            
+            done += len(updates)
+            elapsed = time.perf_counter() - start
+            print(f"Hashed {done}/{total} passwords ({done / elapsed:.1f}/s)")
     
-    conn.commit()
-    conn.close()
     print("All passwords have been reset")
+    return done
 
 if __name__ == "__main__":
-    reset_passwords()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reset or hash user passwords with bcrypt")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password to give every user")
+    parser.add_argument("--hash-existing", action="store_true",
+                        help="hash current plaintext passwords instead of resetting them")
+    parser.add_argument("--rounds", type=int, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    reset_passwords(args.password, args.hash_existing, args.rounds, args.workers, args.chunk_size)
\ No newline at end of file
@@ -0,0 +1,161 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import database
+
+# Flush once this many results are waiting...
+BATCH_SIZE = 200
+# ...or once the oldest waiting result is this many seconds old
+FLUSH_INTERVAL = 0.05
+# Submissions beyond this backlog are written synchronously instead
+MAX_QUEUE = 10000
+
+# Buffer result writes on a background thread instead of committing each one
+WRITE_BEHIND = os.getenv("QUIZ_WRITE_BEHIND", "0") == "1"
+
+_STOP = object()
+
+class ResultWriter:
+    """Write-behind queue that coalesces quiz results into batched transactions.
+
+    submit() returns as soon as the result is queued. A worker thread writes
+    queued results with database.store_quiz_results once BATCH_SIZE are
+    waiting or FLUSH_INTERVAL has passed, and close() (also run at interpreter
+    exit) drains whatever is left. When the writer isn't running or the
+    queue is full, submit() falls back to a synchronous store_quiz_result.
+    Batches go to store(results) instead when one is given.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_queue=MAX_QUEUE, store=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.store = store
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"queued": 0, "batches": 0, "written": 0, "synchronous": 0, "errors": 0}
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, user_email, subject, topic, difficulty, score, total_questions):
+        """Queue a result for the next batch, or store it now if we can't queue"""
+        result = (user_email, subject, topic, difficulty, score, total_questions, datetime.now())
+        # Queue under the lock close() takes to stop the worker, so a result
+        # can't land after the final drain and be lost
+        with self._lock:
+            if self.running:
+                try:
+                    self._queue.put_nowait(result)
+                    self._stats["queued"] += 1
+                    return
+                except queue.Full:
+                    pass
+            self._stats["synchronous"] += 1
+        database.store_quiz_result(user_email, subject, topic, difficulty, score, total_questions)
+
+    def flush(self):
+        """Block until every queued result has been written"""
+        if self.running:
+            self._queue.join()
+
+    def close(self):
+        """Write everything still queued and stop the worker"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._thread = None
+        if thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join()
+
+        # Anything the worker left behind (e.g. it died) is written here
+        leftovers = []
+        while True:
+            try:
+                result = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if result is not _STOP:
+                leftovers.append(result)
+            self._queue.task_done()
+        if leftovers:
+            self._write(leftovers)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        try:
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+
+                while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+
+                stop = batch[-1] is _STOP
+                results = [result for result in batch if result is not _STOP]
+                if results:
+                    self._write(results)
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            database.close_connections()
+
+    def _write(self, results):
+        store = self.store or database.store_quiz_results
+        try:
+            store(results)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["written"] += len(results)
+        except Exception as e:
+            # Retry one by one so a single bad row can't drop the whole batch
+            print(f"Error storing result batch, retrying individually: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            for result in results:
+                try:
+                    store([result])
+                    with self._lock:
+                        self._stats["written"] += 1
+                except Exception as e:
+                    print(f"Error storing quiz result: {e}")
+
+    def stats(self):
+        with self._lock:
+            result = dict(self._stats)
+        result["backlog"] = self._queue.qsize()
+        return result
+
+# Shared writer; only started when write-behind is enabled
+writer = ResultWriter()
+if WRITE_BEHIND:
+    writer.start()
+
+def submit_quiz_result(user_email, subject, topic, difficulty, score, total_questions):
+    """Store a quiz result, through the write-behind queue when it is enabled"""
+    writer.submit(user_email, subject, topic, difficulty, score, total_questions)
@@ -0,0 +1,73 @@
+import pytest
+
+import article_cache
+import wiki_client
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(article_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(article_cache, "_total_bytes", None)
+    monkeypatch.setattr(article_cache, "_stats", {"hits": 0, "misses": 0, "evictions": 0})
+    calls = []
+
+    def fake_search(query):
+        calls.append(("search", query))
+        return [{"pageid": 7, "title": query}]
+
+    def fake_extract(page_id):
+        calls.append(("extract", page_id))
+        return f"Article {page_id} text. " * 20
+
+    monkeypatch.setattr(wiki_client, "search", fake_search)
+    monkeypatch.setattr(wiki_client, "fetch_extract", fake_extract)
+    return calls
+
+def test_repeated_lookups_hit_cache(cache):
+    article_cache.search("Photosynthesis  Biology")
+    article_cache.search("photosynthesis biology")
+    article_cache.fetch_extract(7)
+    article_cache.fetch_extract(7)
+
+    assert cache == [("search", "Photosynthesis  Biology"), ("extract", 7)]
+    stats = article_cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+def test_expired_entries_are_refetched(cache, monkeypatch):
+    article_cache.fetch_extract(7)
+    monkeypatch.setattr(article_cache, "TTL_SECONDS", -1)
+    article_cache.fetch_extract(7)
+
+    assert cache == [("extract", 7), ("extract", 7)]
+
+def test_size_cap_evicts_least_recently_used(cache, monkeypatch):
+    article_cache.fetch_extract(1)
+    entry_size = article_cache.stats()["bytes"]
+    # Room for two entries; the slack absorbs small differences in entry size
+    monkeypatch.setattr(article_cache, "MAX_BYTES", entry_size * 2 + entry_size // 2)
+
+    article_cache.fetch_extract(2)
+    article_cache.fetch_extract(1)  # page 1 is now the most recently used
+    article_cache.fetch_extract(3)
+
+    assert article_cache.stats()["evictions"] == 1
+    assert article_cache.get("extract", "1") is not None
+    assert article_cache.get("extract", "2") is None
+
+def test_eviction_leaves_headroom(cache, monkeypatch):
+    article_cache.fetch_extract(0)
+    entry_size = article_cache.stats()["bytes"]
+    monkeypatch.setattr(article_cache, "MAX_BYTES", entry_size * 10 + entry_size // 2)
+    scans = []
+    entries = article_cache._entries
+    monkeypatch.setattr(article_cache, "_entries", lambda: scans.append(1) or entries())
+
+    for page_id in range(1, 11):
+        article_cache.fetch_extract(page_id)
+    assert len(scans) == 1
+    assert article_cache.stats()["evictions"] == 2
+
+    # The next put fits under the cap without another scan
+    article_cache.fetch_extract(11)
+    assert len(scans) == 1
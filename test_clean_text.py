@@ -0,0 +1,114 @@
+import random
+import re
+
+import quiz_generator
+from quiz_generator import clean_text
+
+def legacy_clean_text(text):
+    """The original five-pass clean_text from fetch_topic_content"""
+    text = re.sub(r'\[\d+\]', '', text)
+    text = re.sub(r'\([^)]*\)', '', text)
+    text = re.sub(r'[^\w\s.,!?;:-]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([.,!?;:])\s*', r'\1 ', text)
+    return text.strip()
+
+def test_cleans_wiki_text():
+    text = "Photosynthesis (from Greek) converts light[1] into  energy .Plants #use it[23]!\n\nThe end"
+    assert clean_text(text) == "Photosynthesis converts light into energy. Plants use it! The end"
+
+def test_matches_legacy_on_tricky_nesting():
+    for text in ["[[1]]", "#(abc)", "[(x)1]", "((a)b)", "a ( b", "x . , y", "é—ü [12] (z) —"]:
+        assert clean_text(text) == legacy_clean_text(text)
+
+def test_matches_legacy_on_random_text():
+    rng = random.Random(0)
+    alphabet = "ab1 2\n\t.,!?;:-[]()#é_"
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+        assert clean_text(text) == legacy_clean_text(text), text
+
+ARTICLE = """Photosynthesis is how plants[1] turn light into energy.
+
+== Process ==
+Light is absorbed by chlorophyll (a green pigment).
+
+=== Light reactions ===
+Water is split and oxygen is released.
+
+== References ==
+Smith, J. (2001). Plants.
+
+=== Citations ===
+Doe, A. Light.
+
+== Legacy ==
+Crops depend on it.
+"""
+
+def test_article_sections_are_split_cleaned_and_filtered():
+    assert list(quiz_generator.iter_article_sections(ARTICLE)) == [
+        "Photosynthesis is how plants turn light into energy.",
+        "Light is absorbed by chlorophyll.",
+        "Water is split and oxygen is released.",
+        "Crops depend on it.",
+    ]
+    assert list(quiz_generator.iter_article_sections("No headings here.")) == ["No headings here."]
+
+def test_article_sections_are_cleaned_lazily(monkeypatch):
+    cleaned = []
+
+    def clean(text):
+        cleaned.append(text)
+        return clean_text(text)
+
+    monkeypatch.setattr(quiz_generator, "clean_text", clean)
+    sections = quiz_generator.iter_article_sections(ARTICLE)
+    next(sections)
+    assert len(cleaned) == 1
+
+def test_template_questions_stop_after_enough_sections(monkeypatch):
+    monkeypatch.setattr(quiz_generator.nlp_resources, "sent_tokenize", lambda text: [text])
+    tagged = []
+
+    def tag_sentences(sentences):
+        tagged.extend(sentences)
+        return [[(word, "NN" if len(word) > 6 else "DT") for word in sentence.split()] for sentence in sentences]
+
+    monkeypatch.setattr(quiz_generator, "tag_sentences", tag_sentences)
+    content = "\n".join(f"== Part {i} ==\nSection number {i} talks about chloroplasts." for i in range(50))
+
+    questions = quiz_generator.generate_template_questions(content, "Biology", "Photosynthesis", "beginner", 3)
+    assert len(questions) == 3
+    assert len(tagged) == 3
+    assert all(len(question["options"]) == 4 for question in questions)
+
+def test_each_article_is_sectioned_separately(monkeypatch):
+    monkeypatch.setattr(quiz_generator.nlp_resources, "sent_tokenize", lambda text: [text])
+    monkeypatch.setattr(quiz_generator, "tag_sentences",
+                        lambda sentences: [[(word, "NN") for word in sentence.split()[:2]] for sentence in sentences])
+    articles = [
+        "Alpha intro sentence about cells.\nCells divide.\n== See also ==\n\n== References ==\n",
+        "Beta intro sentence about mitochondria.\n== Function ==\nThey make ATP in cells.",
+    ]
+
+    questions = quiz_generator.generate_template_questions(articles, "Biology", "Cells", "beginner", 10)
+    explanations = " ".join(question["explanation"] for question in questions)
+    assert "Beta intro sentence about mitochondria." in explanations
+    assert "They make ATP in cells." in explanations
+
+def test_top_up_skips_sentences_already_in_pool(monkeypatch):
+    monkeypatch.setattr(quiz_generator.nlp_resources, "sent_tokenize", lambda text: [text])
+    monkeypatch.setattr(quiz_generator, "tag_sentences",
+                        lambda sentences: [[(word, "NN") for word in sentence.split()[:1]] for sentence in sentences])
+    content = "\n".join(f"== Part {i} ==\nFact{i} is about chloroplasts and light." for i in range(10))
+    pool = quiz_generator.generate_template_questions(content, "Biology", "Photosynthesis", "beginner", 4)
+    stored = []
+
+    monkeypatch.setattr(quiz_generator, "load_cached_questions", lambda *args: pool)
+    monkeypatch.setattr(quiz_generator, "fetch_topic_contents", lambda subject, topic: [content])
+    monkeypatch.setattr(quiz_generator.quiz_cache, "put", lambda *args: stored.append(args[-1]))
+
+    assert quiz_generator.top_up_question_pool("Biology", "Photosynthesis", "beginner", 8) == 4
+    answers = [question["options"][question["answer"]] for question in stored[0]]
+    assert len(set(answers)) == 8
@@ -0,0 +1,289 @@
+import sqlite3
+import threading
+
+import pytest
+
+import database
+import login_guard
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "quiz_app.db"))
+    monkeypatch.setattr(database, "LEGACY_USERS_DB", str(tmp_path / "users.db"))
+    monkeypatch.setattr(login_guard, "limiter", login_guard.TokenBucketLimiter(capacity=100))
+    monkeypatch.setattr(login_guard, "account_limiter", login_guard.TokenBucketLimiter(capacity=100))
+    monkeypatch.setattr(login_guard, "sessions", login_guard.VerifiedSessionCache())
+    database.init_db()
+    yield
+    database.close_connections()
+
+def test_user_signup_and_login():
+    database.add_user("ada@example.com", "secret")
+    with pytest.raises(ValueError):
+        database.add_user("ada@example.com", "other")
+
+    assert database.login_user("ada@example.com", "secret")
+    assert not database.login_user("ada@example.com", "wrong")
+    assert not database.login_user("nobody@example.com", "secret")
+
+def test_results_and_stats():
+    database.add_user("ada@example.com", "secret")
+    database.store_quiz_result("ada@example.com", "Biology", "Cells", "beginner", 4, 5)
+    database.store_quiz_result("ada@example.com", "Biology", "Genes", "advanced", 2, 5)
+
+    scores = database.get_user_scores("ada@example.com")
+    assert [row[1] for row in scores] == ["Genes", "Cells"]
+    assert database.get_user_stats("ada@example.com") == {
+        "total_quizzes": 2,
+        "avg_score": 60.0,
+        "highest_score": 80.0,
+    }
+
+def test_connection_is_reused_per_thread_with_wal():
+    conn = database.get_connection()
+    assert database.get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(database.get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+def test_successive_threads_reuse_pooled_connection():
+    seen = []
+
+    def use_connection():
+        conn = database.get_connection()
+        seen.append(conn)
+        conn.execute("SELECT 1")
+
+    for _ in range(3):
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        thread.join()
+
+    assert seen[0] is seen[1] is seen[2]
+
+    # Threads running at the same time each get their own connection
+    barrier = threading.Barrier(2)
+    concurrent = []
+
+    def hold_connection():
+        concurrent.append(database.get_connection())
+        barrier.wait()
+
+    threads = [threading.Thread(target=hold_connection) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert concurrent[0] is not concurrent[1]
+    assert seen[0] in concurrent
+
+def test_schema_is_created_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(database, "create_schema", calls.append)
+    database.init_db()
+    database.init_db()
+    assert calls == []
+
+def test_migrations_add_user_timestamp_index():
+    conn = database.get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(database.MIGRATIONS)
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM quiz_results WHERE user_email = ?", ("ada@example.com",)
+    ).fetchall()
+    assert "idx_quiz_results_user_timestamp" in " ".join(row[-1] for row in plan)
+
+def test_migrations_upgrade_existing_database(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    old = sqlite3.connect(path)
+    database.create_schema(old)
+    old.execute("INSERT INTO quiz_results (user_email, subject, topic, difficulty, score, total_questions) "
+                "VALUES ('ada@example.com', 'Biology', 'Cells', 'beginner', 3, 5)")
+    old.commit()
+    old.close()
+
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    database.init_db()
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 1
+    assert database.get_connection().execute("PRAGMA user_version").fetchone()[0] == len(database.MIGRATIONS)
+
+def test_migration_backfills_zero_question_results(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    old = sqlite3.connect(path)
+    database.create_schema(old)
+    old.executemany("INSERT INTO quiz_results (user_email, subject, topic, difficulty, score, total_questions) "
+                    "VALUES ('ada@example.com', 'Biology', 'Cells', 'beginner', ?, ?)", [(0, 0), (4, 5)])
+    old.commit()
+    old.close()
+
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    database.init_db()
+    stats = database.get_user_stats("ada@example.com")
+    assert stats["total_quizzes"] == 2
+    assert stats["avg_score"] == 40.0
+    assert stats["highest_score"] == 80.0
+    assert database.get_user_subject_stats("ada@example.com")
+
+def test_running_stats_match_history():
+    database.add_user("ada@example.com", "secret")
+    database.store_quiz_result("ada@example.com", "Biology", "Cells", "beginner", 4, 5)
+    database.store_quiz_result("ada@example.com", "History", "Rome", "beginner", 1, 5)
+    database.store_quiz_result("ada@example.com", "Biology", "Genes", "beginner", 5, 5)
+
+    assert database.get_user_stats("ada@example.com") == {
+        "total_quizzes": 3,
+        "avg_score": 66.7,
+        "highest_score": 100.0,
+    }
+    assert database.get_user_subject_stats("ada@example.com") == {
+        "Biology": {"total_quizzes": 2, "avg_score": 90.0, "highest_score": 100.0},
+        "History": {"total_quizzes": 1, "avg_score": 20.0, "highest_score": 20.0},
+    }
+    assert database.get_user_stats("nobody@example.com")["total_quizzes"] == 0
+
+def test_failed_store_leaves_stats_untouched(monkeypatch):
+    database.store_quiz_result("ada@example.com", "Biology", "Cells", "beginner", 4, 5)
+    monkeypatch.setattr(database, "UPDATE_SUBJECT_STATS_SQL", "INSERT INTO missing_table VALUES (?, ?, ?)")
+    database.store_quiz_result("ada@example.com", "Biology", "Genes", "beginner", 5, 5)
+
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 1
+    assert len(database.get_user_scores("ada@example.com")) == 1
+
+def test_score_pages_walk_history_newest_first():
+    for i in range(7):
+        database.store_quiz_result("ada@example.com", "Biology", f"Topic {i}", "beginner", i % 6, 5)
+
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = database.get_user_scores_page("ada@example.com", limit=3, before=cursor)
+        seen.extend(row[1] for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == [f"Topic {i}" for i in reversed(range(7))]
+
+def test_score_columns():
+    database.store_quiz_result("ada@example.com", "Biology", "Cells", "beginner", 4, 5)
+    database.store_quiz_result("ada@example.com", "Biology", "Genes", "beginner", 2, 4)
+
+    columns, cursor = database.get_user_score_columns("ada@example.com", limit=5)
+    assert cursor is None
+    assert list(columns["topic"]) == ["Genes", "Cells"]
+    assert list(columns["percentage"]) == [50.0, 80.0]
+    assert columns["score"].dtype.kind == "i"
+
+    empty, _ = database.get_user_score_columns("nobody@example.com")
+    assert all(len(values) == 0 for values in empty.values())
+
+def test_legacy_users_db_is_merged_once(tmp_path, monkeypatch):
+    legacy = sqlite3.connect(tmp_path / "users.db")
+    legacy.execute("CREATE TABLE users (email TEXT PRIMARY KEY, password TEXT, average_score REAL DEFAULT 0.0)")
+    legacy.execute("INSERT INTO users VALUES ('old@example.com', 'legacy', 3.5)")
+    legacy.execute("INSERT INTO users VALUES ('ada@example.com', 'stale', 1.0)")
+    legacy.commit()
+    legacy.close()
+
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "merged.db"))
+    conn = database.get_connection()
+    database.create_schema(conn)
+    database.migrate(conn)
+    database.add_user("ada@example.com", "current")
+
+    assert database.merge_users_db(conn) == 1
+    assert database.merge_users_db(conn) == 0
+    assert database.login_user("old@example.com", "legacy")
+    assert database.login_user("ada@example.com", "current")
+    assert database.get_user_progress("old@example.com") == 3.5
+
+def test_auth_uses_shared_storage():
+    import auth
+
+    assert auth.signup("grace@example.com", "secret")
+    assert not auth.signup("grace@example.com", "secret")
+    assert auth.login("grace@example.com", "secret")
+
+    auth.update_progress("grace@example.com", 4)
+    assert auth.get_user_progress("grace@example.com") == 2.0
+    assert database.get_user_score("grace@example.com") == 2.0
+
+def stored_password(email):
+    return database.get_connection().execute("SELECT password FROM users WHERE email = ?", (email,)).fetchone()[0]
+
+def test_new_passwords_are_bcrypt_hashed():
+    database.add_user("ada@example.com", "secret")
+    assert database.is_bcrypt_hash(stored_password("ada@example.com"))
+
+def test_login_upgrades_plaintext_and_cheap_hashes(monkeypatch):
+    conn = database.get_connection()
+    conn.execute("INSERT INTO users (email, password) VALUES ('old@example.com', 'legacy')")
+    conn.commit()
+
+    assert not database.login_user("old@example.com", "wrong")
+    assert stored_password("old@example.com") == "legacy"
+
+    assert database.login_user("old@example.com", "legacy")
+    first_hash = stored_password("old@example.com")
+    assert database.is_bcrypt_hash(first_hash)
+
+    monkeypatch.setattr(database, "BCRYPT_ROUNDS", 5)
+    # Logins served from the verified-session cache don't reach the rehash
+    login_guard.sessions.clear()
+    assert database.login_user("old@example.com", "legacy")
+    assert stored_password("old@example.com").startswith("$2b$05$")
+
+def test_bulk_reset_and_hash_existing():
+    import reset_passwords
+
+    conn = database.get_connection()
+    conn.executemany("INSERT INTO users (email, password) VALUES (?, ?)",
+                     [(f"user{i}@example.com", f"pw{i}") for i in range(10)])
+    conn.commit()
+
+    assert reset_passwords.reset_passwords(hash_existing=True, workers=2, chunk_size=3) == 10
+    assert database.login_user("user3@example.com", "pw3")
+    assert reset_passwords.reset_passwords(hash_existing=True, workers=2) == 0
+
+    assert reset_passwords.reset_passwords("fresh", workers=2, chunk_size=4) == 10
+    assert database.login_user("user7@example.com", "fresh")
+
+def test_repeat_login_skips_password_check(monkeypatch):
+    database.add_user("ada@example.com", "secret")
+    assert database.login_user("ada@example.com", "secret")
+
+    def fail(*args):
+        raise AssertionError("password was checked again")
+
+    monkeypatch.setattr(database, "verify_password", fail)
+    assert database.login_user("ada@example.com", "secret")
+    with pytest.raises(AssertionError):
+        database.login_user("ada@example.com", "other")
+
+def test_login_attempts_are_throttled(monkeypatch):
+    import auth
+
+    monkeypatch.setattr(login_guard, "limiter", login_guard.TokenBucketLimiter(capacity=3, refill_per_second=0))
+    database.add_user("ada@example.com", "secret")
+
+    for _ in range(3):
+        assert not database.login_user("ada@example.com", "wrong")
+    with pytest.raises(login_guard.LoginThrottled):
+        database.login_user("ada@example.com", "secret")
+    assert not auth.login("ada@example.com", "secret")
+
+def test_password_reset_elsewhere_invalidates_cached_login():
+    database.add_user("ada@example.com", "secret")
+    assert database.login_user("ada@example.com", "secret")
+
+    # As reset_passwords would from its own process
+    conn = database.get_connection()
+    conn.execute("UPDATE users SET password = ? WHERE email = ?", (database.hash_password("fresh"), "ada@example.com"))
+    conn.commit()
+
+    assert not database.login_user("ada@example.com", "secret")
+    assert database.login_user("ada@example.com", "fresh")
@@ -0,0 +1,122 @@
+import pytest
+
+import login_guard
+
+def test_token_bucket_limits_and_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(login_guard.time, "monotonic", lambda: now[0])
+    limiter = login_guard.TokenBucketLimiter(capacity=2, refill_per_second=0.5)
+
+    assert limiter.allow("a")
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+    assert limiter.allow("b")
+
+    now[0] += 2
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+
+def test_token_bucket_needs_every_key():
+    limiter = login_guard.TokenBucketLimiter(capacity=1, refill_per_second=0)
+
+    assert limiter.allow("email:a", "client:1")
+    # The client is out of tokens, so a fresh email is refused without spending its token
+    assert not limiter.allow("email:b", "client:1")
+    assert limiter.allow("email:b")
+
+def test_session_cache_expires_and_matches_password(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(login_guard.time, "monotonic", lambda: now[0])
+    sessions = login_guard.VerifiedSessionCache(ttl_seconds=10)
+
+    sessions.add("ada@example.com", "secret", "hash1")
+    assert sessions.check("ada@example.com", "secret", "hash1")
+    assert not sessions.check("ada@example.com", "Secret", "hash1")
+    assert not sessions.check("bob@example.com", "secret", "hash1")
+    # A changed stored hash (e.g. a reset by another process) misses
+    assert not sessions.check("ada@example.com", "secret", "hash2")
+
+    now[0] += 11
+    assert not sessions.check("ada@example.com", "secret", "hash1")
+
+@pytest.fixture
+def guard(monkeypatch):
+    monkeypatch.setattr(login_guard, "limiter", login_guard.TokenBucketLimiter(capacity=2, refill_per_second=0))
+    monkeypatch.setattr(login_guard, "account_limiter", login_guard.TokenBucketLimiter(capacity=3, refill_per_second=0))
+    monkeypatch.setattr(login_guard, "check_slots", login_guard.threading.BoundedSemaphore(1))
+    monkeypatch.setattr(login_guard, "sessions", login_guard.VerifiedSessionCache())
+    monkeypatch.setattr(login_guard, "CHECK_WAIT_SECONDS", 0.01)
+
+class Accounts:
+    """Stand-in users table with lookup and verify callbacks"""
+
+    def __init__(self, **passwords):
+        self.passwords = passwords
+        self.checks = []
+        self.lookups = []
+
+    def lookup(self, email):
+        self.lookups.append(email)
+        password = self.passwords.get(email)
+        return f"hash:{password}" if password else None
+
+    def verify(self, email, password, stored_hash):
+        self.checks.append(password)
+        return stored_hash if stored_hash == f"hash:{password}" else None
+
+    def login(self, email, password, client_id=None):
+        return login_guard.check_login(email, password, client_id, self.lookup, self.verify)
+
+def test_check_login(guard):
+    accounts = Accounts(**{"ada@example.com": "secret"})
+
+    assert not accounts.login("ada@example.com", "wrong", "c1")
+    assert accounts.login("ada@example.com", "secret", "c1")
+    # Cached logins neither verify again nor spend tokens
+    assert accounts.login("ada@example.com", "secret", "c1")
+    assert accounts.checks == ["wrong", "secret"]
+
+    with pytest.raises(login_guard.LoginThrottled):
+        accounts.login("ada@example.com", "wrong", "c1")
+
+    # Another client isn't locked out by c1's bucket, only by the account's
+    assert not accounts.login("ada@example.com", "wrong", "c2")
+    with pytest.raises(login_guard.LoginThrottled):
+        accounts.login("ada@example.com", "wrong", "c3")
+
+def test_rotating_clients_hit_the_account_limit(guard):
+    accounts = Accounts(**{"ada@example.com": "secret"})
+
+    for n in range(3):
+        assert not accounts.login("ada@example.com", "guess", f"session{n}")
+    with pytest.raises(login_guard.LoginThrottled):
+        accounts.login("ada@example.com", "guess", "session3")
+    # Other accounts are unaffected
+    assert not accounts.login("bob@example.com", "guess", "session4")
+
+def test_throttled_attempts_skip_lookup(guard, monkeypatch):
+    monkeypatch.setattr(login_guard, "account_limiter", login_guard.TokenBucketLimiter(capacity=10, refill_per_second=0))
+    accounts = Accounts(**{"ada@example.com": "secret"})
+
+    for _ in range(2):
+        assert not accounts.login("ada@example.com", "guess", "c1")
+    for _ in range(5):
+        with pytest.raises(login_guard.LoginThrottled):
+            accounts.login("ada@example.com", "guess", "c1")
+    assert accounts.lookups == ["ada@example.com"] * 2
+
+    # A password changed behind a cached login is looked up and checked again
+    assert accounts.login("ada@example.com", "secret", "c2")
+    accounts.passwords["ada@example.com"] = "changed"
+    assert not accounts.login("ada@example.com", "secret", "c3")
+
+def test_checks_wait_for_a_free_slot(guard):
+    accounts = Accounts(**{"ada@example.com": "secret"})
+
+    login_guard.check_slots.acquire()
+    try:
+        with pytest.raises(login_guard.LoginThrottled):
+            accounts.login("ada@example.com", "secret", "c1")
+    finally:
+        login_guard.check_slots.release()
+    assert accounts.login("ada@example.com", "secret", "c1")
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+def call_concurrently(batcher, items):
+    results = {}
+
+    def worker(item):
+        try:
+            results[item] = batcher(item)
+        except Exception as e:
+            results[item] = e
+
+    threads = [threading.Thread(target=worker, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_requests_share_batches():
+    batches = []
+
+    def run_batch(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch=4, max_wait=0.2)
+    results = call_concurrently(batcher, range(10))
+
+    assert results == {item: item * 2 for item in range(10)}
+    assert sorted(item for batch in batches for item in batch) == list(range(10))
+    assert max(len(batch) for batch in batches) == 4
+    assert len(batches) < 10
+
+    stats = batcher.stats()
+    assert stats["requests"] == 10
+    assert stats["batches"] == len(batches)
+    assert stats["largest_batch"] == 4
+
+def test_lone_request_runs_after_max_wait():
+    batcher = MicroBatcher(lambda items: [item.upper() for item in items], max_batch=8, max_wait=0.01)
+    assert batcher("quiz") == "QUIZ"
+    assert batcher.submit("again").result(timeout=1) == "AGAIN"
+
+def test_errors_reach_every_caller_in_the_batch():
+    def run_batch(items):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(run_batch, max_batch=4, max_wait=0.1)
+    results = call_concurrently(batcher, ["a", "b", "c"])
+    assert all(isinstance(result, RuntimeError) for result in results.values())
+
+    short = MicroBatcher(lambda items: items[:-1], max_wait=0)
+    with pytest.raises(RuntimeError):
+        short("a")
+    assert short.stats()["errors"] == 1
+
+def test_generate_batch_groups_by_max_length():
+    from quiz_generator import generate_batch
+
+    class Encoded:
+        def __init__(self, prompts):
+            self.input_ids = prompts
+            self.attention_mask = None
+
+    class Tokenizer:
+        def __call__(self, prompts, **kwargs):
+            assert kwargs["padding"]
+            return Encoded(prompts)
+
+        def batch_decode(self, outputs, skip_special_tokens):
+            return outputs
+
+    calls = []
+
+    class Model:
+        def generate(self, input_ids, max_length, **kwargs):
+            calls.append((list(input_ids), max_length))
+            return [f"{prompt}:{max_length}" for prompt in input_ids]
+
+    requests = [("a", 10), ("b", 20), ("c", 10)]
+    assert generate_batch(Tokenizer(), Model(), requests) == ["a:10", "b:20", "c:10"]
+    assert calls == [(["a", "c"], 10), (["b"], 20)]
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry, parameter_bytes
+
+class FakeTensor:
+    def __init__(self, numel):
+        self._numel = numel
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return 4
+
+class FakeModel:
+    def parameters(self):
+        return [FakeTensor(10), FakeTensor(5)]
+
+    def buffers(self):
+        return [FakeTensor(1)]
+
+class FakePipeline:
+    def __init__(self):
+        self.model = FakeModel()
+
+def test_models_load_once_per_name_and_config():
+    registry = ModelRegistry()
+    loads = []
+
+    def loader(name, **config):
+        loads.append((name, config))
+        return FakePipeline()
+
+    small = registry.get("small", loader, max_length=512)
+    assert registry.get("small", loader, max_length=512) is small
+    assert registry.get("small", loader, max_length=256) is not small
+    assert loads == [("small", {"max_length": 512}), ("small", {"max_length": 256})]
+
+    info = registry.stats()[0]
+    assert info["name"] == "small"
+    assert info["config"] == {"max_length": 512}
+    assert info["parameter_bytes"] == 64
+    assert info["load_seconds"] >= 0
+
+    registry.unload("small")
+    assert registry.stats() == []
+
+def test_concurrent_first_requests_share_one_load():
+    registry = ModelRegistry()
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        time.sleep(0.1)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("m", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["m"]
+    assert all(result is results[0] for result in results)
+
+def test_failed_loads_are_retried():
+    registry = ModelRegistry()
+    attempts = []
+
+    def loader(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise OSError("download failed")
+        return "model"
+
+    with pytest.raises(OSError):
+        registry.get("m", loader)
+    assert registry.get("m", loader) == "model"
+    assert len(attempts) == 2
+
+def test_parameter_bytes():
+    assert parameter_bytes((object(), FakeModel())) == 64
+    assert parameter_bytes(object()) == 0
+
+def test_resident_bytes_without_resource_module(monkeypatch):
+    import builtins
+    import importlib
+    import model_registry
+
+    real_import = builtins.__import__
+
+    def no_resource(name, *args, **kwargs):
+        if name == "resource":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_resource)
+    try:
+        reloaded = importlib.reload(model_registry)
+        assert reloaded.resource is None
+        rss = reloaded.resident_bytes()
+        assert rss is None or rss > 0
+    finally:
+        monkeypatch.undo()
+        importlib.reload(model_registry)
+
+def test_unknown_backend_is_rejected():
+    import quiz_generator
+
+    with pytest.raises(ValueError, match="fp16"):
+        quiz_generator.load_seq2seq("facebook/bart-large", "fp16")
+
+def test_backend_is_part_of_registry_key(monkeypatch):
+    import quiz_generator
+
+    loads = []
+
+    def load_seq2seq(model_name, backend="fp32", token=None):
+        loads.append(backend)
+        return object(), FakeModel()
+
+    monkeypatch.setenv("HUGGINGFACE_API_KEY", "test")
+    monkeypatch.setattr(quiz_generator, "registry", ModelRegistry())
+    monkeypatch.setattr(quiz_generator, "load_seq2seq", load_seq2seq)
+
+    assert quiz_generator.init_model("fp32") is not None
+    assert quiz_generator.init_model("int8") is not None
+    assert quiz_generator.init_model("fp32") is not None
+
+    assert loads == ["fp32", "int8"]
+    assert sorted(info["config"]["backend"] for info in quiz_generator.registry.stats()) == ["fp32", "int8"]
@@ -0,0 +1,50 @@
+import pytest
+
+import nlp_resources
+
+class FakeTokenizer:
+    def tokenize(self, text):
+        return text.split(". ")
+
+@pytest.fixture
+def loader(monkeypatch):
+    monkeypatch.setattr(nlp_resources, "_resources", {})
+    monkeypatch.setattr(nlp_resources, "_load_time", None)
+    calls = []
+
+    def load_resources():
+        calls.append(1)
+        return {"sentence_tokenizer": FakeTokenizer(), "stopwords": frozenset({"the"})}
+
+    monkeypatch.setattr(nlp_resources, "load_resources", load_resources)
+    return calls
+
+def test_warm_up_loads_once(loader):
+    assert nlp_resources.load_stats() == {"loaded": False, "load_time": None, "resources": []}
+
+    load_time = nlp_resources.warm_up()
+    assert nlp_resources.warm_up() == load_time
+    assert nlp_resources.sent_tokenize("One. Two") == ["One", "Two"]
+    assert loader == [1]
+
+    stats = nlp_resources.load_stats()
+    assert stats["loaded"]
+    assert stats["load_time"] == load_time
+    assert stats["resources"] == ["sentence_tokenizer", "stopwords"]
+
+def test_first_use_warms_up(loader):
+    assert nlp_resources.get_stopwords() == frozenset({"the"})
+    assert loader == [1]
+
+def test_failed_warm_up_is_retried(loader, monkeypatch):
+    def offline():
+        raise LookupError("Resource punkt not found")
+
+    monkeypatch.setattr(nlp_resources, "load_resources", offline)
+    with pytest.raises(LookupError):
+        nlp_resources.warm_up()
+    assert not nlp_resources.load_stats()["loaded"]
+
+    monkeypatch.setattr(nlp_resources, "load_resources", lambda: {"stopwords": frozenset()})
+    nlp_resources.warm_up()
+    assert nlp_resources.load_stats()["loaded"]
@@ -0,0 +1,90 @@
+import threading
+
+import question_pool
+from question_pool import QuestionPool
+
+def make_pool(added=5):
+    calls = []
+
+    def refill(subject, topic, difficulty, target):
+        calls.append((topic, target))
+        return added
+
+    return QuestionPool(refill, pool_size=50, low_watermark=20, hot_after=3), calls
+
+def test_only_hot_keys_below_watermark_are_topped_up():
+    pool, calls = make_pool()
+
+    assert not pool.record_request("k", "Biology", "Cells", "beginner", 5)
+    assert not pool.record_request("k", "Biology", "Cells", "beginner", 5)
+    assert pool.record_request("k", "Biology", "Cells", "beginner", 5)
+    pool.wait_idle()
+    assert calls == [("Cells", 50)]
+
+    # A full pool is left alone even for a hot key
+    assert not pool.record_request("k", "Biology", "Cells", "beginner", 40)
+
+def test_pending_top_up_is_not_queued_twice():
+    release = threading.Event()
+    calls = []
+
+    def slow_refill(subject, topic, difficulty, target):
+        calls.append(topic)
+        release.wait()
+        return 1
+
+    pool = QuestionPool(slow_refill, hot_after=1)
+    assert pool.schedule("k", "Biology", "Cells", "beginner")
+    assert not pool.schedule("k", "Biology", "Cells", "beginner")
+    release.set()
+    pool.wait_idle()
+
+    assert calls == ["Cells"]
+    assert pool.stats()["pending"] == 0
+
+def test_exhausted_keys_back_off():
+    pool, calls = make_pool(added=0)
+    assert pool.schedule("k", "Biology", "Cells", "beginner")
+    pool.wait_idle()
+
+    assert not pool.schedule("k", "Biology", "Cells", "beginner")
+    assert len(calls) == 1
+
+def test_refill_errors_are_contained():
+    def broken_refill(subject, topic, difficulty, target):
+        raise RuntimeError("network down")
+
+    pool = QuestionPool(broken_refill, hot_after=1)
+    pool.schedule("k", "Biology", "Cells", "beginner")
+    pool.wait_idle()
+
+    assert pool.stats()["errors"] == 1
+
+def test_sample_returns_distinct_questions():
+    pool, _ = make_pool()
+    questions = [{"question": str(i)} for i in range(50)]
+    sample = pool.sample(questions, 5)
+
+    assert len(sample) == 5
+    assert len({q["question"] for q in sample}) == 5
+    assert len(pool.sample(questions[:3], 5)) == 3
+
+def test_tracked_keys_are_bounded(monkeypatch):
+    monkeypatch.setattr(question_pool, "MAX_TRACKED_KEYS", 2)
+    pool, _ = make_pool()
+    for key in ["a", "b", "c"]:
+        pool.record_request(key, "Biology", key, "beginner", 50)
+
+    assert pool.stats()["tracked_keys"] == 2
+
+def test_backoffs_are_bounded(monkeypatch):
+    monkeypatch.setattr(question_pool, "MAX_TRACKED_KEYS", 2)
+    pool, calls = make_pool(added=0)
+    for key in ["a", "b", "c"]:
+        pool.schedule(key, "Biology", key, "beginner")
+        pool.wait_idle()
+
+    # The oldest backoff was forgotten, the newest still applies
+    assert pool.schedule("a", "Biology", "a", "beginner")
+    pool.wait_idle()
+    assert not pool.schedule("c", "Biology", "c", "beginner")
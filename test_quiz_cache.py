@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import pytest
+
+import quiz_cache
+
+QUESTIONS = [
+    {"question": f"What is photosynthesis {i}?", "options": {"A": "a", "B": "b", "C": "c", "D": "d"}, "answer": "A"}
+    for i in range(5)
+]
+
+@pytest.fixture(autouse=True)
+def cache_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(quiz_cache, "CACHE_PATH", str(tmp_path / "quiz_cache.db"))
+    monkeypatch.setattr(quiz_cache, "_stats", {"hits": 0, "misses": 0, "writes": 0, "memory_hits": 0, "memory_misses": 0})
+    monkeypatch.setattr(quiz_cache, "_memory", OrderedDict())
+    monkeypatch.setattr(quiz_cache, "_memory_bytes", 0)
+    monkeypatch.setattr(quiz_cache, "_touches", {})
+    yield
+    quiz_cache.close_connections()
+
+def test_round_trip_with_canonical_key():
+    assert quiz_cache.get("Biology", "Photosynthesis", "beginner") is None
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS)
+
+    quiz_cache.clear_memory()
+    assert quiz_cache.get("  biology ", "PHOTOSYNTHESIS", "Beginner") == QUESTIONS
+    stats = quiz_cache.stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_keys_that_used_to_collide_stay_apart():
+    # The old JSON cache mapped both of these to "a_b_c_beginner"
+    quiz_cache.put("A B", "C", "beginner", QUESTIONS[:1])
+    quiz_cache.put("A", "B C", "beginner", QUESTIONS[1:2])
+
+    assert quiz_cache.get("A B", "C", "beginner") == QUESTIONS[:1]
+    assert quiz_cache.get("A", "B C", "beginner") == QUESTIONS[1:2]
+
+def test_uses_wal_journal():
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS)
+    mode = sqlite3.connect(quiz_cache.CACHE_PATH).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_successive_threads_reuse_pooled_connection():
+    seen = []
+
+    def use_cache():
+        quiz_cache.get("Biology", "Photosynthesis", "beginner")
+        seen.append(quiz_cache.get_connection())
+
+    for _ in range(2):
+        thread = threading.Thread(target=use_cache)
+        thread.start()
+        thread.join()
+
+    assert seen[0] is seen[1]
+
+def test_expired_entries_miss(monkeypatch):
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS)
+    quiz_cache.clear_memory()
+    monkeypatch.setattr(quiz_cache, "TTL_SECONDS", -1)
+
+    assert quiz_cache.get("Biology", "Photosynthesis", "beginner") is None
+    assert quiz_cache.evict() == 1
+
+def test_evict_keeps_most_recently_used():
+    for topic in ["one", "two", "three"]:
+        quiz_cache.put("Biology", topic, "beginner", QUESTIONS)
+    quiz_cache.get("Biology", "one", "beginner")
+
+    assert quiz_cache.evict(max_entries=2) == 1
+    assert quiz_cache.get("Biology", "two", "beginner") is None
+    assert quiz_cache.get("Biology", "one", "beginner") == QUESTIONS
+
+def test_concurrent_writers():
+    def writer(n):
+        for i in range(20):
+            quiz_cache.put("Biology", f"topic {n} {i}", "beginner", QUESTIONS)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert quiz_cache.stats()["entries"] == 80
+
+def test_memory_front_serves_repeat_hits():
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS)
+    for _ in range(3):
+        assert quiz_cache.get("Biology", "Photosynthesis", "beginner") is not None
+
+    stats = quiz_cache.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["hits"] == 0
+    assert stats["memory_hit_ratio"] == 1.0
+
+def test_rewrite_invalidates_memory_entry():
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS)
+    quiz_cache.get("Biology", "Photosynthesis", "beginner")
+    quiz_cache.put("Biology", "Photosynthesis", "beginner", QUESTIONS[:2])
+
+    assert quiz_cache.get("Biology", "Photosynthesis", "beginner") == QUESTIONS[:2]
+
+    quiz_cache.delete("Biology", "Photosynthesis", "beginner")
+    assert quiz_cache.get("Biology", "Photosynthesis", "beginner") is None
+
+def test_memory_front_respects_entry_cap(monkeypatch):
+    monkeypatch.setattr(quiz_cache, "MEMORY_MAX_ENTRIES", 2)
+    for topic in ["one", "two", "three"]:
+        quiz_cache.put("Biology", topic, "beginner", QUESTIONS)
+
+    assert quiz_cache.stats()["memory_entries"] == 2
+    assert quiz_cache.get("Biology", "one", "beginner") == QUESTIONS
+    assert quiz_cache.stats()["hits"] == 1
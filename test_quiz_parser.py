@@ -0,0 +1,38 @@
+from quiz_parser import QuizParser, parse_quiz_text
+
+VALID = (
+    "Q1. Which organelle carries out photosynthesis?\n"
+    "A. Mitochondrion\nB. Chloroplast\nC. Ribosome\nD. Nucleus\nAnswer: b\n"
+)
+
+def test_parses_dict_options():
+    assert parse_quiz_text(VALID) == [{
+        "question": "Which organelle carries out photosynthesis?",
+        "options": {"A": "Mitochondrion", "B": "Chloroplast", "C": "Ribosome", "D": "Nucleus"},
+        "answer": "B",
+    }]
+
+def test_invalid_and_unfinished_questions_are_dropped():
+    text = (
+        "Here is your quiz:\n"
+        "A. stray option before any question\n"
+        "Q1. Short?\nA. 1\nB. 2\nC. 3\nD. 4\nAnswer: A\n"
+        "Q2. Which one has only three options?\nA. x\nB. y\nC. z\nAnswer: A\n"
+        "Q3. Which answer letter is out of range?\nA. x\nB. y\nC. z\nD. w\nAnswer: E\n"
+        "Q4. Which question never gets an answer?\nA. x\nB. y\nC. z\nD. w\n"
+        + VALID
+    )
+    assert [q["answer"] for q in parse_quiz_text(text)] == ["B"]
+
+def test_feed_emits_questions_when_their_answer_line_ends():
+    parser = QuizParser()
+    assert parser.feed(VALID.split("Answer")[0]) == []
+    assert parser.feed("Answer: ") == []
+    assert parser.feed("B") == []
+    assert len(parser.feed("\nQ2. Next")) == 1
+    assert parser.close() == []
+
+def test_last_line_without_newline_is_parsed_on_close():
+    parser = QuizParser()
+    assert parser.feed(VALID.rstrip("\n")) == []
+    assert len(parser.close()) == 1
@@ -0,0 +1,54 @@
+import quiz_generator
+
+QUIZ_TEXT = (
+    "Q1. Which organelle carries out photosynthesis?\n"
+    "A. Mitochondrion\nB. Chloroplast\nC. Ribosome\nD. Nucleus\nAnswer: B\n"
+    "Q2. What gas do plants release during photosynthesis?\n"
+    "A. Oxygen\nB. Nitrogen\nC. Carbon dioxide\nD. Helium\nAnswer: A"
+)
+
+def chunked(text, size):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+def test_questions_are_yielded_as_each_answer_arrives():
+    sent = []
+
+    def chunks():
+        for chunk in chunked(QUIZ_TEXT, 7):
+            sent.append(chunk)
+            yield chunk
+
+    stream = quiz_generator.iter_quiz_questions(chunks())
+    first = next(stream)
+    assert first == {
+        "question": "Which organelle carries out photosynthesis?",
+        "options": {"A": "Mitochondrion", "B": "Chloroplast", "C": "Ribosome", "D": "Nucleus"},
+        "answer": "B",
+    }
+    # The first question was ready before the rest of the text was generated
+    assert "".join(sent) != QUIZ_TEXT
+
+    rest = list(stream)
+    assert [question["answer"] for question in rest] == ["A"]
+    assert rest[0]["options"]["C"] == "Carbon dioxide"
+
+def test_chunking_does_not_change_the_result():
+    expected = list(quiz_generator.iter_quiz_questions([QUIZ_TEXT]))
+    assert len(expected) == 2
+    for size in (1, 3, 16, 1000):
+        assert list(quiz_generator.iter_quiz_questions(chunked(QUIZ_TEXT, size))) == expected
+
+def test_model_stream_stops_at_num_questions(monkeypatch):
+    closed = []
+
+    def stream_text(prompt):
+        try:
+            yield from chunked(QUIZ_TEXT, 5)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(quiz_generator, "init_model", lambda backend, stream: stream_text)
+    questions = list(quiz_generator.stream_model_questions("Biology", "Photosynthesis", "beginner", 1))
+    assert len(questions) == 1
+    assert closed == [True]
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+import database
+from result_writer import ResultWriter
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "quiz_app.db"))
+    monkeypatch.setattr(database, "LEGACY_USERS_DB", str(tmp_path / "users.db"))
+    database.init_db()
+    yield
+    database.close_connections()
+
+def test_without_worker_writes_synchronously():
+    writer = ResultWriter()
+    writer.submit("ada@example.com", "Biology", "Cells", "beginner", 4, 5)
+
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 1
+    assert writer.stats()["synchronous"] == 1
+
+def test_concurrent_submissions_are_batched():
+    writer = ResultWriter(batch_size=50, flush_interval=0.2)
+    writer.start()
+
+    def submit_many(n):
+        for i in range(100):
+            writer.submit(f"user{n}@example.com", "Biology", f"Topic {i}", "beginner", i % 6, 5)
+
+    threads = [threading.Thread(target=submit_many, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.flush()
+
+    stats = writer.stats()
+    assert stats["written"] == 400
+    assert stats["batches"] < 400
+    for n in range(4):
+        assert database.get_user_stats(f"user{n}@example.com")["total_quizzes"] == 100
+    writer.close()
+
+def test_close_drains_queue():
+    writer = ResultWriter(batch_size=1000, flush_interval=60)
+    writer.start()
+    for i in range(10):
+        writer.submit("ada@example.com", "Biology", f"Topic {i}", "beginner", 3, 5)
+    writer.close()
+
+    assert not writer.running
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 10
+
+def test_full_queue_falls_back_to_synchronous_write():
+    # Hold the worker inside its first write so it can't drain the queue
+    writing = threading.Event()
+    release = threading.Event()
+
+    def store(results):
+        writing.set()
+        release.wait()
+        database.store_quiz_results(results)
+
+    writer = ResultWriter(batch_size=1, flush_interval=60, max_queue=2, store=store)
+    writer.start()
+    writer.submit("ada@example.com", "Biology", "Topic 0", "beginner", 3, 5)
+    assert writing.wait(5)
+    for i in range(1, 5):
+        writer.submit("ada@example.com", "Biology", f"Topic {i}", "beginner", 3, 5)
+    release.set()
+    writer.close()
+
+    assert writer.stats()["synchronous"] == 2
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 5
+
+def test_result_submitted_during_close_is_not_lost():
+    class ClosingWriter(ResultWriter):
+        """Starts close() from another thread the moment submit() checks running"""
+
+        closer = None
+
+        @property
+        def running(self):
+            running = super().running
+            if running and self.closer is None:
+                self.closer = threading.Thread(target=self.close)
+                self.closer.start()
+                # Give close() time to finish unless submit() holds it off
+                self.closer.join(0.2)
+            return running
+
+    writer = ClosingWriter(flush_interval=0.01)
+    writer.start()
+    writer.submit("ada@example.com", "Biology", "Cells", "beginner", 3, 5)
+    writer.closer.join()
+
+    assert database.get_user_stats("ada@example.com")["total_quizzes"] == 1
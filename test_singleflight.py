@@ -0,0 +1,127 @@
+import threading
+import time
+
+from question_pool import QuestionPool
+from singleflight import SingleFlight
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["question"]
+
+    results, errors = run_concurrently(8, lambda: flight.do("biology", generate))
+
+    assert len(calls) == 1
+    assert errors == [None] * 8
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"executions": 1, "shared": 7}
+    assert flight.in_flight() == 0
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError("fetch failed")
+
+    _, errors = run_concurrently(4, lambda: flight.do("biology", fail))
+
+    assert all(isinstance(error, ValueError) for error in errors)
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.do("a", lambda: 3) == 3
+    assert flight.stats()["executions"] == 3
+
+def test_identical_quiz_requests_generate_once(monkeypatch, tmp_path):
+    import quiz_cache
+    import quiz_generator
+
+    monkeypatch.setattr(quiz_cache, "CACHE_PATH", str(tmp_path / "quiz_cache.db"))
+    monkeypatch.setattr(quiz_generator, "generation_flight", SingleFlight())
+    monkeypatch.setattr(quiz_generator, "question_pool", QuestionPool(lambda *args: 0))
+    runs = []
+
+    def fake_sequential(subject, topic, difficulty, num_questions):
+        runs.append(topic)
+        time.sleep(0.2)
+        return quiz_generator.generate_generic_questions(subject, topic, difficulty, num_questions)
+
+    monkeypatch.setattr(quiz_generator, "generate_sequential_questions", fake_sequential)
+
+    results, errors = run_concurrently(
+        5, lambda: quiz_generator.generate_quiz_questions("Biology", "Single flight", "beginner", 5, concurrent=False)
+    )
+
+    assert errors == [None] * 5
+    assert runs == ["Single flight"]
+    assert all(len(result) == 5 for result in results)
+
+def test_quiz_requests_for_different_counts_share_one_generation(monkeypatch, tmp_path):
+    import quiz_cache
+    import quiz_generator
+
+    monkeypatch.setattr(quiz_cache, "CACHE_PATH", str(tmp_path / "quiz_cache.db"))
+    monkeypatch.setattr(quiz_generator, "generation_flight", SingleFlight())
+    monkeypatch.setattr(quiz_generator, "question_pool", QuestionPool(lambda *args: 0))
+    runs = []
+    started = threading.Event()
+
+    def fake_sequential(subject, topic, difficulty, num_questions):
+        runs.append(num_questions)
+        started.set()
+        time.sleep(0.2)
+        return quiz_generator.generate_generic_questions(subject, topic, difficulty, num_questions)
+
+    monkeypatch.setattr(quiz_generator, "generate_sequential_questions", fake_sequential)
+
+    def request(count):
+        return quiz_generator.generate_quiz_questions("Biology", "Shared counts", "beginner", count, concurrent=False)
+
+    # Requests queued before generation starts are folded into its size
+    with quiz_generator._requested_lock:
+        quiz_generator._requested_counts[quiz_cache.key_hash("Biology", "Shared counts", "beginner")] = 8
+    results, errors = run_concurrently(3, lambda: request(3))
+
+    assert errors == [None] * 3
+    assert runs == [8]
+    assert all(len(result) == 3 for result in results)
+
+    # A larger request that joins a smaller generation already under way runs again
+    runs.clear()
+    started.clear()
+
+    def request_other(count):
+        return quiz_generator.generate_quiz_questions("Biology", "Joined late", "beginner", count, concurrent=False)
+
+    small = threading.Thread(target=request_other, args=(3,))
+    small.start()
+    assert started.wait(5)
+    large = request_other(6)
+    small.join()
+
+    assert runs == [3, 6]
+    assert len(large) == 6
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import article_cache
+import wiki_client
+
+ARTICLE = "Photosynthesis is the process plants use to turn light into chemical energy. " * 10
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Minimal MediaWiki API stand-in serving one search hit and one extract"""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        time.sleep(server.delay)
+        if server.failures > 0:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        params = parse_qs(urlparse(self.path).query)
+        if params.get("list") == ["search"]:
+            hits = [] if server.no_results else [{"pageid": 42, "title": params["srsearch"][0]}]
+            body = {"query": {"search": hits}}
+        else:
+            page_id = params["pageids"][0]
+            body = {"query": {"pages": {page_id: {"extract": ARTICLE}}}}
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stand_in_server(monkeypatch, tmp_path):
+    monkeypatch.setattr(wiki_client, "BACKOFF_FACTOR", 0)
+    monkeypatch.setattr(article_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(article_cache, "_total_bytes", None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.requests = []
+    server.failures = 0
+    server.delay = 0
+    server.no_results = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    wiki_client.configure(f"http://127.0.0.1:{server.server_port}/w/api.php")
+    yield server
+    server.shutdown()
+    server.server_close()
+    wiki_client.configure(None)
+
+def test_search_and_extract(stand_in_server):
+    results = wiki_client.search("Photosynthesis Biology")
+    assert results[0]["pageid"] == 42
+    assert wiki_client.fetch_extract(42) == ARTICLE
+
+def test_session_is_shared():
+    assert wiki_client.get_session() is wiki_client.get_session()
+
+def test_retries_transient_errors(stand_in_server):
+    stand_in_server.failures = 2
+    assert wiki_client.search("Photosynthesis")[0]["pageid"] == 42
+    assert len(stand_in_server.requests) == 3
+
+def test_fetch_topic_content_uses_client(stand_in_server):
+    from quiz_generator import fetch_topic_content
+
+    content = fetch_topic_content("Biology", "Photosynthesis")
+    assert content.startswith("Photosynthesis is the process")
+    assert "srsearch=Photosynthesis+Biology" in stand_in_server.requests[0]
+
+def test_fetch_topic_contents_runs_variants_concurrently(stand_in_server):
+    from quiz_generator import QUERY_VARIANTS, fetch_topic_contents
+
+    stand_in_server.delay = 0.2
+    start = time.perf_counter()
+    articles = fetch_topic_contents("Biology", "Photosynthesis")
+    elapsed = time.perf_counter() - start
+
+    # Every variant hits the same page, so the union is a single article
+    assert len(articles) == 1
+    assert len(stand_in_server.requests) == 2 * len(QUERY_VARIANTS)
+    assert elapsed < 2 * 0.2 * len(QUERY_VARIANTS)
+
+def test_fetch_topic_contents_falls_back_without_another_search(stand_in_server):
+    from quiz_generator import QUERY_VARIANTS, fetch_topic_contents, generic_topic_content
+
+    stand_in_server.no_results = True
+    articles = fetch_topic_contents("Biology", "Unfindable")
+
+    assert articles == [generic_topic_content("Biology", "Unfindable")]
+    assert len(stand_in_server.requests) == len(QUERY_VARIANTS)
@@ -0,0 +1,86 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "https://en.wikipedia.org/w/api.php"
+USER_AGENT = "TinyQuizGenerator/1.0 (https://github.com/madhavydv/Tiny_project)"
+
+# (connect, read) timeout in seconds for every request
+DEFAULT_TIMEOUT = (3.05, 10)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 10
+
+_lock = threading.Lock()
+_session = None
+_base_url = None
+
+def get_base_url():
+    """Base URL of the MediaWiki API, overridable for local stand-in servers"""
+    return _base_url or os.getenv("WIKIPEDIA_API_URL", DEFAULT_BASE_URL)
+
+def configure(base_url=None):
+    """Point the client at a different API endpoint and drop pooled connections"""
+    global _base_url
+
+    _base_url = base_url
+    reset_session()
+
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_session():
+    """Return the process-wide keep-alive session, creating it on first use"""
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def reset_session():
+    """Close the shared session so the next request opens fresh connections"""
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def api_get(params, timeout=DEFAULT_TIMEOUT):
+    """Issue a GET against the API and return the decoded JSON body"""
+    query = {"format": "json"}
+    query.update(params)
+
+    response = get_session().get(get_base_url(), params=query, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def search(query, timeout=DEFAULT_TIMEOUT):
+    """Return the list of search hits for a query"""
+    data = api_get({"action": "query", "list": "search", "srsearch": query}, timeout=timeout)
+    return data.get("query", {}).get("search", [])
+
+def fetch_extract(page_id, timeout=DEFAULT_TIMEOUT):
+    """Return the plain-text extract of a page"""
+    data = api_get(
+        {"action": "query", "prop": "extracts", "explaintext": 1, "pageids": page_id},
+        timeout=timeout,
+    )
+    return data["query"]["pages"][str(page_id)]["extract"]